@@ -0,0 +1,44 @@
+"""Measures cold import time of the entry points in fresh interpreters.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py [--repeat 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("interpreter only", "pass"),
+    ("import peacock_config", "import peacock_config"),
+    ("import configurator (lazy GUI)", "import configurator"),
+    ("configurator.PicklistManager", "import configurator; configurator.PicklistManager"),
+    ("import configurator_gui (eager GUI)", "import configurator_gui"),
+]
+
+def best_of(code, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = None
+    for label, code in CASES:
+        elapsed = best_of(code, args.repeat)
+        if baseline is None:
+            baseline = elapsed
+        print(f"{label:<40} {elapsed * 1000:8.1f} ms  (+{(elapsed - baseline) * 1000:6.1f} ms over interpreter)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compares the strict-JSON fast path against json5 on generated configs.
+
+Run from the repository root:
+
+    python benchmarks/bench_loader.py [--sizes 10 100 1000 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json5 as json_lib
+from peacock_config import loads_json, dumps_json
+
+def generate_config(blocks, seed=0):
+    rng = random.Random(seed)
+    config = []
+    for _ in range(blocks):
+        envs = [{"account": "%012d" % rng.randrange(10**12), "region": rng.choice(["us-east-1", "us-west-2", "eu-west-1"])}
+                for _ in range(rng.randint(1, 3))]
+        config.append({
+            "env": envs[0] if len(envs) == 1 else envs,
+            "style": {
+                "navigationBackgroundColor": "#%06x" % rng.randrange(0x1000000),
+                "accountMenuButtonBackgroundColor": "#%06x" % rng.randrange(0x1000000),
+            },
+        })
+    return config
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'blocks':>8} {'bytes':>10} {'json5 (s)':>12} {'fast (s)':>12} {'fallback (s)':>13} {'speedup':>8}")
+    for size in args.sizes:
+        data = generate_config(size)
+        relaxed = dumps_json(data)
+        strict = dumps_json(data, strict=True)
+        assert loads_json(strict) == loads_json(relaxed) == data
+
+        json5_time = best_of(lambda: json_lib.loads(relaxed), args.repeat)
+        fast_time = best_of(lambda: loads_json(strict), args.repeat)
+        # Relaxed input pays for the failed strict attempt before falling back
+        fallback_time = best_of(lambda: loads_json(relaxed), args.repeat)
+        print(f"{size:>8} {len(strict):>10} {json5_time:>12.4f} {fast_time:>12.4f} {fallback_time:>13.4f} {json5_time / fast_time:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
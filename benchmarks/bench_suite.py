@@ -0,0 +1,194 @@
+"""Times the load, lookup, render, sync and save hot paths on synthetic configs.
+
+Run from the repository root:
+
+    python benchmarks/bench_suite.py [--sizes 10 100 1000 10000] [--output results.json]
+
+Results are written as JSON (stdout by default) so runs from different
+releases can be diffed. The GUI timings need a display: with no $DISPLAY the
+suite starts Xvfb when it is installed, otherwise they are reported as
+skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json5
+from bench_loader import generate_config
+from peacock_config import PicklistManager, loads_json, dumps_json, clean_config
+
+REGIONS = ["us-east-1", "us-east-2", "us-west-1", "us-west-2", "eu-west-1", "eu-central-1", "ap-southeast-2"]
+# Lookups per timed run, so small picklists still give measurable times
+LOOKUPS = 1000
+
+def generate_picklists(config, seed=0):
+    """Picklists naming every account the config uses."""
+    rng = random.Random(seed)
+    ids = sorted({env["account"] for block in config for env in (block["env"] if isinstance(block["env"], list) else [block["env"]])})
+    accounts = [{"id": account_id, "name": "team-%s-%d" % (rng.choice(["dev", "test", "prod"]), n)} for n, account_id in enumerate(ids)]
+    return {"regions": list(REGIONS), "accounts": accounts}
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_parse(config, repeat):
+    relaxed = dumps_json(config)
+    strict = dumps_json(config, strict=True)
+    return {
+        "bytes": len(relaxed),
+        "json5_loads": best_of(lambda: json5.loads(relaxed), repeat),
+        "json5_dumps": best_of(lambda: json5.dumps(config, indent=4), repeat),
+        "loads_json_strict": best_of(lambda: loads_json(strict), repeat),
+        "loads_json_relaxed": best_of(lambda: loads_json(relaxed), repeat),
+        "dumps_json_strict": best_of(lambda: dumps_json(config, strict=True), repeat),
+    }
+
+def bench_picklists(config, repeat, workdir):
+    filepath = os.path.join(workdir, "picklists.json")
+    with open(filepath, "w") as f:
+        json.dump(generate_picklists(config), f)
+    manager = PicklistManager(filepath)
+    ids = [acc["id"] for acc in manager.accounts] or [""]
+    rng = random.Random(1)
+    sample_ids = [rng.choice(ids) for _ in range(LOOKUPS)]
+    sample_displays = [manager.get_account_display(account_id) for account_id in sample_ids]
+    prefixes = [account_id[:3] for account_id in sample_ids]
+
+    def rebuild():
+        manager.invalidate_account_display()
+        manager.get_account_display_list()
+
+    # Per-call times, in seconds
+    return {
+        "accounts": len(manager.accounts),
+        "load": best_of(lambda: PicklistManager(filepath), repeat),
+        "display_list_rebuild": best_of(rebuild, repeat),
+        "get_account_display": best_of(lambda: [manager.get_account_display(a) for a in sample_ids], repeat) / LOOKUPS,
+        "get_account_id_from_display": best_of(lambda: [manager.get_account_id_from_display(d) for d in sample_displays], repeat) / LOOKUPS,
+        "search_accounts": best_of(lambda: [manager.search_accounts(p) for p in prefixes], repeat) / LOOKUPS,
+        "search_regions": best_of(lambda: [manager.search_regions("us") for _ in range(LOOKUPS)], repeat) / LOOKUPS,
+    }
+
+def ensure_display():
+    """Returns an Xvfb process to stop later (or None), and whether a display is usable."""
+    if os.environ.get("DISPLAY"):
+        return None, True
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None, False
+    display = ":%d" % (90 + os.getpid() % 100)
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1)
+    if proc.poll() is not None:
+        return None, False
+    os.environ["DISPLAY"] = display
+    return proc, True
+
+def bench_gui(configs, repeat, workdir):
+    """Render and sync timings per size, from one app instance."""
+    from configurator_gui import ConfiguratorApp
+
+    # The app reads window_config.json and the example config from the working directory
+    os.chdir(workdir)
+    app = ConfiguratorApp()
+    app.withdraw()
+    results = {}
+    try:
+        for size, config in configs.items():
+            def render_fresh():
+                app.config_data = []
+                app.render_config_items()
+                app.config_data = config
+                app.block_index.rebuild(config)
+                app.render_config_items()
+                app.update_idletasks()
+
+            def rerender():
+                app.render_config_items()
+                app.update_idletasks()
+
+            def sync_all():
+                # Worst case, every visible card was edited
+                app.dirty_blocks = {id(item): item for item in config if app.state_of(item).env_container is not None}
+                app.sync_widgets_to_data()
+
+            results[str(size)] = {
+                "render_fresh": best_of(render_fresh, repeat),
+                "render_unchanged": best_of(rerender, repeat),
+                "sync_all_dirty": best_of(sync_all, repeat),
+                "get_clean_config_data": best_of(app.get_clean_config_data, repeat),
+                "virtual_mode": app.virtual_mode,
+            }
+        app.config_data = []
+        app.render_config_items()
+    finally:
+        app.picklist_manager.flush()
+        app.destroy()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-gui", action="store_true", help="skip the render/sync timings")
+    parser.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    configs = {size: generate_config(size) for size in args.sizes}
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "sizes": args.sizes,
+        "parse": {},
+        "picklists": {},
+        "clean_config": {},
+    }
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        for size, config in configs.items():
+            print(f"Benchmarking {size} blocks...", file=sys.stderr)
+            results["parse"][str(size)] = bench_parse(config, args.repeat)
+            results["picklists"][str(size)] = bench_picklists(config, args.repeat, workdir)
+            results["clean_config"][str(size)] = best_of(lambda: clean_config(config), args.repeat)
+
+        if args.no_gui:
+            results["gui"] = {"skipped": "--no-gui"}
+        else:
+            xvfb, has_display = ensure_display()
+            try:
+                if has_display:
+                    print("Benchmarking GUI render/sync...", file=sys.stderr)
+                    results["gui"] = bench_gui(configs, args.repeat, workdir)
+                else:
+                    results["gui"] = {"skipped": "no $DISPLAY and Xvfb is not installed"}
+            finally:
+                os.chdir(cwd)
+                if xvfb is not None:
+                    xvfb.terminate()
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
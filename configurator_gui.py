@@ -0,0 +1,1686 @@
+import customtkinter as ctk
+import argparse
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox, colorchooser
+import sys
+import json
+import queue
+import threading
+import time
+
+from peacock_index import BlockIndex
+from peacock_analyze import analyze_config, format_report
+from peacock_merge import merge_configs, format_conflicts
+from peacock_history import ConfigHistory, freeze_block, same_snapshot
+from peacock_trace import NULL_TRACER, tracer_from_env
+from peacock_workspace import ParseCache, list_config_files, stat_key
+from peacock_config import (
+    PicklistManager, load_json_file, loads_json, serialize_config, compact_config, size_report,
+    content_hash, write_file_atomic,
+    generate_distinct_colors, assign_seeded_themes, set_theme, get_envs, new_block, clean_block, clean_config,
+)
+
+# Above this many blocks the config list switches to a windowed (virtualized) view
+VIRTUAL_LIST_THRESHOLD = 200
+# Number of cards kept alive in the windowed view
+VIRTUAL_WINDOW_SIZE = 10
+# Cards created per event-loop tick while a loaded file streams in
+RENDER_BATCH_SIZE = 20
+# Account rows shown at once in the picklist editor, large imports are paged
+ACCOUNT_PAGE_SIZE = 100
+# Bytes read between progress updates / cancel checks on the loader thread
+LOAD_CHUNK_SIZE = 256 * 1024
+# Event-loop heartbeat and overlay refresh intervals when tracing
+HEARTBEAT_MS = 100
+TRACE_OVERLAY_MS = 1000
+
+appearance_ready = False
+
+class LoadCancelled(Exception):
+    pass
+
+class BlockState:
+    """UI state of one block, kept in a side table so config_data holds only the data that is saved."""
+    __slots__ = ("block", "collapsed", "env_container", "style_widgets", "env_is_dict", "frozen")
+
+    def __init__(self, block):
+        self.block = block # keeps id(block) from being reused while this state exists
+        self.collapsed = False
+        self.env_container = None # frame holding the env rows, None until the card content is built
+        self.style_widgets = None # [(style key, entry)]
+        self.env_is_dict = isinstance(block.get("env"), dict)
+        self.frozen = None # last frozen view, see peacock_history
+
+def read_config_in_background(filepath, cancel_event, report_progress, tracer=NULL_TRACER, cache=None):
+    """Runs on a worker thread: reads in chunks so progress and cancel stay responsive, then parses.
+
+    Returns (data, content hash of the text read, stat key of the file).
+    """
+    # Taken before reading, a write racing with the read then shows up as a changed stat
+    key = stat_key(filepath)
+    cached = cache.get(filepath, key) if cache is not None else None
+    if cached is not None:
+        data, digest = cached
+    else:
+        size = max(key[1], 1)
+        chunks = []
+        done = 0
+        with open(filepath, 'r') as f:
+            while True:
+                if cancel_event.is_set():
+                    raise LoadCancelled()
+                chunk = f.read(LOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                done += len(chunk)
+                # Reading is the first half of the bar, parsing and rendering the rest
+                report_progress(min(done / size, 1.0) * 0.5)
+        text = "".join(chunks)
+        with tracer.span("parse", bytes=len(text)):
+            data = loads_json(text)
+        # Drop any underscore keys here, the model is saved as-is afterwards
+        if isinstance(data, list):
+            data = [clean_block(block) if isinstance(block, dict) and any(k.startswith("_") for k in block) else block for block in data]
+        digest = content_hash(text)
+        if cache is not None:
+            cache.put(filepath, key, data, digest)
+    if cancel_event.is_set():
+        raise LoadCancelled()
+    # Cached blocks are shared; the GUI edits shallow copies, safe since env/style values are replaced, not mutated
+    if cache is not None and isinstance(data, list):
+        data = [dict(block) if isinstance(block, dict) else block for block in data]
+    return data, digest, key
+
+def setup_appearance():
+    # Deferred until the first window is created so importing stays cheap
+    global appearance_ready
+    if appearance_ready:
+        return
+    # Set default appearance mode and color theme
+    ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
+
+    ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
+    appearance_ready = True
+
+def install_widget_counters(tracer):
+    """Counts every Tk widget created and destroyed, including the parts of composite CTk widgets."""
+    setup, destroy = tk.BaseWidget._setup, tk.BaseWidget.destroy
+    def counted_setup(widget, master, cnf):
+        tracer.count("widgets_created")
+        setup(widget, master, cnf)
+    def counted_destroy(widget):
+        tracer.count("widgets_destroyed")
+        destroy(widget)
+    tk.BaseWidget._setup = counted_setup
+    tk.BaseWidget.destroy = counted_destroy
+
+class PicklistEditor(ctk.CTkToplevel):
+    def __init__(self, parent, manager):
+        setup_appearance()
+        super().__init__(parent)
+        self.manager = manager
+        self.title("Manage Picklists")
+        self.title("Manage Picklists")
+        
+        # Position relative to parent
+        try:
+            px = parent.winfo_x()
+            py = parent.winfo_y()
+            # Offset slightly
+            self.geometry(f"600x500+{px+50}+{py+50}")
+        except:
+             self.geometry("600x500")
+        
+        # Stay on top of parent
+        self.transient(parent)
+        self.lift()
+        self.focus_force()
+        self.after(200, lambda: self.focus()) # Ensure focus sticks
+
+        self.tabview = ctk.CTkTabview(self)
+        self.tabview.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.tab_regions = self.tabview.add("Regions")
+        self.tab_accounts = self.tabview.add("Accounts")
+        
+        self.setup_regions_tab()
+        self.setup_accounts_tab()
+        
+    def setup_regions_tab(self):
+        # Add Area
+        add_frame = ctk.CTkFrame(self.tab_regions)
+        add_frame.pack(fill="x", padx=10, pady=10)
+        
+        self.region_entry = ctk.CTkEntry(add_frame, placeholder_text="Region Code (e.g. us-west-2)")
+        self.region_entry.pack(side="left", fill="x", expand=True, padx=5, pady=5)
+        
+        add_btn = ctk.CTkButton(add_frame, text="Add", width=80, command=self.add_region)
+        add_btn.pack(side="left", padx=5)
+        
+        # List Area
+        self.regions_scroll = ctk.CTkScrollableFrame(self.tab_regions, label_text="Existing Regions")
+        self.regions_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.refresh_regions()
+        
+    def refresh_regions(self):
+        for widget in self.regions_scroll.winfo_children():
+            widget.destroy()
+            
+        for region in self.manager.regions:
+            row = ctk.CTkFrame(self.regions_scroll)
+            row.pack(fill="x", padx=5, pady=2)
+            ctk.CTkLabel(row, text=region).pack(side="left", padx=5)
+            ctk.CTkButton(row, text="X", width=30, fg_color="red", command=lambda r=region: self.delete_region(r)).pack(side="right", padx=5)
+
+    def add_region(self):
+        val = self.region_entry.get().strip()
+        if self.manager.add_region(val):
+            self.region_entry.delete(0, "end")
+            self.refresh_regions()
+            
+    def delete_region(self, region):
+        if self.manager.remove_region(region):
+            self.refresh_regions()
+
+    def setup_accounts_tab(self):
+        # Add Area
+        add_frame = ctk.CTkFrame(self.tab_accounts)
+        add_frame.pack(fill="x", padx=10, pady=10)
+        
+        self.acc_id_entry = ctk.CTkEntry(add_frame, placeholder_text="Account ID")
+        self.acc_id_entry.pack(side="left", fill="x", expand=True, padx=5, pady=5)
+        
+        self.acc_name_entry = ctk.CTkEntry(add_frame, placeholder_text="Account Name")
+        self.acc_name_entry.pack(side="left", fill="x", expand=True, padx=5, pady=5)
+        
+        add_btn = ctk.CTkButton(add_frame, text="Add", width=80, command=self.add_account)
+        add_btn.pack(side="left", padx=5)
+
+        import_btn = ctk.CTkButton(add_frame, text="Import...", width=80, command=self.import_accounts)
+        import_btn.pack(side="left", padx=5)
+        
+        # Paging, so an import of thousands of accounts builds one page of rows
+        page_frame = ctk.CTkFrame(self.tab_accounts, fg_color="transparent")
+        page_frame.pack(fill="x", padx=10)
+        self.acc_filter_entry = ctk.CTkEntry(page_frame, placeholder_text="Find account name or ID")
+        self.acc_filter_entry.pack(side="left", fill="x", expand=True, padx=5)
+        self.acc_filter_entry.bind("<KeyRelease>", lambda event: self.refresh_accounts(page=0))
+        self.acc_next_btn = ctk.CTkButton(page_frame, text=">", width=30, command=lambda: self.refresh_accounts(self.account_page + 1))
+        self.acc_next_btn.pack(side="right", padx=5)
+        self.acc_page_label = ctk.CTkLabel(page_frame, text="")
+        self.acc_page_label.pack(side="right", padx=5)
+        self.acc_prev_btn = ctk.CTkButton(page_frame, text="<", width=30, command=lambda: self.refresh_accounts(self.account_page - 1))
+        self.acc_prev_btn.pack(side="right", padx=5)
+        self.account_page = 0
+
+        # List Area
+        self.accounts_scroll = ctk.CTkScrollableFrame(self.tab_accounts, label_text="Existing Accounts")
+        self.accounts_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.refresh_accounts()
+
+    def refresh_accounts(self, page=None):
+        for widget in self.accounts_scroll.winfo_children():
+            widget.destroy()
+
+        query = self.acc_filter_entry.get().strip()
+        if query:
+            # Type-ahead index, best matches first
+            rows = [(display, self.manager.get_account_id_from_display(display))
+                    for display in self.manager.search_accounts(query, limit=ACCOUNT_PAGE_SIZE)]
+            self.account_page = 0
+            self.acc_page_label.configure(text=f"{len(rows)} matches" if len(rows) < ACCOUNT_PAGE_SIZE else f"first {ACCOUNT_PAGE_SIZE} matches")
+            self.acc_prev_btn.configure(state="disabled")
+            self.acc_next_btn.configure(state="disabled")
+        else:
+            total = len(self.manager.accounts)
+            pages = max(1, -(-total // ACCOUNT_PAGE_SIZE))
+            self.account_page = max(0, min(self.account_page if page is None else page, pages - 1))
+            start = self.account_page * ACCOUNT_PAGE_SIZE
+            accounts = self.manager.accounts[start:start + ACCOUNT_PAGE_SIZE]
+            rows = [(f"{acc['name']} ({acc['id']})", acc["id"]) for acc in accounts]
+            self.acc_page_label.configure(text=f"{start + 1 if total else 0}-{start + len(rows)} of {total}")
+            self.acc_prev_btn.configure(state="normal" if self.account_page > 0 else "disabled")
+            self.acc_next_btn.configure(state="normal" if self.account_page < pages - 1 else "disabled")
+
+        for label, account_id in rows:
+            row = ctk.CTkFrame(self.accounts_scroll)
+            row.pack(fill="x", padx=5, pady=2)
+            ctk.CTkLabel(row, text=label).pack(side="left", padx=5)
+            ctk.CTkButton(row, text="X", width=30, fg_color="red", command=lambda id=account_id: self.delete_account(id)).pack(side="right", padx=5)
+
+    def add_account(self):
+        aid = self.acc_id_entry.get().strip()
+        name = self.acc_name_entry.get().strip()
+        if aid and name:
+            if self.manager.add_account(aid, name):
+                self.acc_id_entry.delete(0, "end")
+                self.acc_name_entry.delete(0, "end")
+                self.refresh_accounts()
+            else:
+                messagebox.showerror("Error", "Account ID already exists or invalid.")
+    
+    def import_accounts(self):
+        filename = filedialog.askopenfilename(parent=self, filetypes=[("Organizations Export", "*.json *.csv"), ("All Files", "*.*")])
+        if not filename:
+            return
+        try:
+            added, skipped = self.manager.import_accounts(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import accounts: {e}", parent=self)
+            return
+        if added:
+            self.refresh_accounts()
+        messagebox.showinfo("Import Complete", f"Added {added} accounts, skipped {skipped} existing or invalid.", parent=self)
+    
+    def delete_account(self, aid):
+        if self.manager.remove_account(aid):
+            self.refresh_accounts()
+
+class ReportWindow(ctk.CTkToplevel):
+    """Read-only, scrollable list of report lines."""
+    def __init__(self, parent, title, lines):
+        setup_appearance()
+        super().__init__(parent)
+        self.title(title)
+        try:
+            self.geometry(f"700x400+{parent.winfo_x()+50}+{parent.winfo_y()+50}")
+        except:
+            self.geometry("700x400")
+        self.transient(parent)
+        self.lift()
+
+        textbox = ctk.CTkTextbox(self, wrap="word")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        textbox.insert("1.0", "\n".join(lines))
+        textbox.configure(state="disabled")
+
+        ctk.CTkButton(self, text="Close", width=80, command=self.destroy).pack(pady=(0, 10))
+
+class ConfiguratorApp(ctk.CTk):
+    def __init__(self, tracer=None):
+        # Opt-in profiling, see peacock_trace; counters go in before any widget exists
+        self.tracer = tracer or tracer_from_env()
+        if self.tracer.enabled:
+            install_widget_counters(self.tracer)
+        self.heartbeat_after_id = None
+        self.trace_overlay_after_id = None
+
+        setup_appearance()
+        super().__init__()
+
+        self.title("Configuration Tool")
+        self.title("Configuration Tool")
+        
+        self.window_config_file = "window_config.json"
+        self.apply_window_settings()
+        
+        # Bind close event to save window state
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        self.picklist_manager = PicklistManager(save_delay=0.5)
+        self.picklist_window = None
+        self.filepath = None
+        self.saved_hash = None # hash of the text last read from or written to filepath
+        self.file_stat = None # (mtime, size) of filepath when last read or written
+        self.saved_snapshot = () # history snapshot matching the file, to tell if there are unsaved edits
+        self.merge_base = [] # blocks as last read from or written to filepath, base for merging on save
+        # Workspace mode: a directory of configs shown as tabs
+        self.parse_cache = ParseCache()
+        self.tabs = {} # path -> stashed session of a tab with unsaved edits, or None
+        self.config_data = []
+        self.block_states = {} # id(block) -> BlockState
+        self.cards = {} # id(block) -> card widget record
+        self.dirty_blocks = {} # id(block) -> block whose widgets were edited since the last sync
+        self.selected_blocks = {} # id(block) -> block ticked in its card header
+        self.block_index = BlockIndex(self.picklist_manager)
+        self.filter_matches = None # ids of blocks matching the filter box, None when it is empty
+        # Worker threads hand results back through this queue, drained by poll_ui_queue
+        self.ui_queue = queue.Queue()
+        self.load_generation = 0 # bumped per load so stale results are ignored
+        self.load_cancel = threading.Event()
+        self.pending_blocks = []
+        self.history = ConfigHistory() # snapshots share unchanged blocks, see peacock_history
+        self.virtual_mode = False
+        self.virtual_slots = [] # recycled card records in windowed mode
+        self.virtual_first = 0 # index of the first block shown in windowed mode
+        self.virtual_count = 0 # blocks the window scrolls over (after filtering)
+
+        # Setup GUI Layout
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(3, weight=1)
+
+        # Header Frame
+        self.header_frame = ctk.CTkFrame(self)
+        self.header_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
+        
+        self.title_label = ctk.CTkLabel(self.header_frame, text="AWS Peacock Configurator", font=ctk.CTkFont(size=20, weight="bold"))
+        self.title_label.pack(side="left", padx=10, pady=10)
+
+        self.save_button = ctk.CTkButton(self.header_frame, text="Save Config", command=self.save_config, state="disabled")
+        self.save_button.pack(side="right", padx=10)
+        
+        self.load_button = ctk.CTkButton(self.header_frame, text="Load Config", command=self.load_config_dialog)
+        self.load_button.pack(side="right", padx=10)
+
+        self.open_folder_button = ctk.CTkButton(self.header_frame, text="Open Folder", width=100, command=self.open_workspace_dialog)
+        self.open_folder_button.pack(side="right", padx=10)
+
+        self.copy_button = ctk.CTkButton(self.header_frame, text="Copy Config", command=self.copy_to_clipboard, fg_color="gray", hover_color="gray30")
+        self.copy_button.pack(side="right", padx=10)
+
+        self.manage_picklists_btn = ctk.CTkButton(self.header_frame, text="Manage Picklists", command=self.open_picklist_manager)
+        self.manage_picklists_btn.pack(side="right", padx=10)
+
+        self.analyze_btn = ctk.CTkButton(self.header_frame, text="Analyze", width=80, command=self.analyze_conflicts)
+        self.analyze_btn.pack(side="right", padx=10)
+
+        self.add_block_btn = ctk.CTkButton(self.header_frame, text="+ Add Block", command=self.add_config_block, fg_color="green", hover_color="darkgreen")
+        self.add_block_btn.pack(side="right", padx=10)
+
+        self.redo_btn = ctk.CTkButton(self.header_frame, text="Redo", width=60, command=self.redo, state="disabled", fg_color="gray", hover_color="gray30")
+        self.redo_btn.pack(side="right", padx=(0, 10))
+
+        self.undo_btn = ctk.CTkButton(self.header_frame, text="Undo", width=60, command=self.undo, state="disabled", fg_color="gray", hover_color="gray30")
+        self.undo_btn.pack(side="right", padx=(10, 0))
+        self.bind("<Control-z>", lambda event: self.undo())
+        self.bind("<Control-y>", lambda event: self.redo())
+        self.bind("<Control-Z>", lambda event: self.redo())
+
+        # One tab per config in the open folder, only gridded in workspace mode
+        self.tab_bar = ctk.CTkSegmentedButton(self, values=[""], command=lambda name: self.switch_tab(self.tab_paths[name]))
+        self.tab_paths = {} # tab label -> path
+
+        # Controls Frame (Expand/Collapse + Title)
+        self.controls_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.controls_frame.grid(row=2, column=0, padx=20, pady=(0, 5), sticky="ew")
+        
+        # Title "Configuration Items"
+        self.config_items_label = ctk.CTkLabel(self.controls_frame, text="Configuration Items", font=ctk.CTkFont(size=16, weight="bold"))
+        self.config_items_label.pack(side="left", padx=5)
+
+        # Filter box, backed by block_index so each keystroke is a few dict lookups
+        self.filter_entry = ctk.CTkEntry(self.controls_frame, width=220, height=24, placeholder_text="Filter: account, name, region, color")
+        self.filter_entry.pack(side="left", padx=10)
+        self.filter_entry.bind("<KeyRelease>", lambda event: self.apply_filter())
+
+        # Buttons (Right aligned)
+        self.collapse_all_btn = ctk.CTkButton(self.controls_frame, text="Collapse All", height=24, width=80, command=self.collapse_all)
+        self.collapse_all_btn.pack(side="right", padx=5)
+        
+        self.expand_all_btn = ctk.CTkButton(self.controls_frame, text="Expand All", height=24, width=80, command=self.expand_all)
+        self.expand_all_btn.pack(side="right", padx=5)
+
+        self.theme_blocks_btn = ctk.CTkButton(self.controls_frame, text="Theme All", height=24, width=110, fg_color="purple", hover_color="purple", command=self.theme_blocks_action)
+        self.theme_blocks_btn.pack(side="right", padx=5)
+
+        # Strict JSON output loads through the fast stdlib parser next time
+        self.strict_json_var = ctk.BooleanVar(value=False)
+        self.strict_json_check = ctk.CTkCheckBox(self.controls_frame, text="Save as strict JSON", variable=self.strict_json_var)
+        self.strict_json_check.pack(side="right", padx=5)
+
+        # Compact output merges same-style blocks and minifies, for the extension's settings box
+        self.compact_output_var = ctk.BooleanVar(value=False)
+        self.compact_output_check = ctk.CTkCheckBox(self.controls_frame, text="Compact output", variable=self.compact_output_var)
+        self.compact_output_check.pack(side="right", padx=5)
+
+        # Load progress, only packed while a load is running
+        self.load_progress = ctk.CTkProgressBar(self.controls_frame, width=150)
+        self.cancel_load_btn = ctk.CTkButton(self.controls_frame, text="Cancel", height=24, width=60, fg_color="gray", hover_color="gray30", command=self.cancel_load)
+        
+        # Scrollable area for config items
+        self.scrollable_frame = ctk.CTkScrollableFrame(self) # Removed label_text
+        self.scrollable_frame.grid(row=3, column=0, padx=20, pady=10, sticky="nsew")
+        self.scrollable_frame.grid_columnconfigure(0, weight=1)
+        self.cards_frame = self.scrollable_frame
+
+        # Windowed view for very large configs, only gridded in virtual mode
+        self.virtual_frame = ctk.CTkFrame(self)
+        self.virtual_frame.grid_columnconfigure(0, weight=1)
+        self.virtual_frame.grid_rowconfigure(0, weight=1)
+        self.virtual_cards_frame = ctk.CTkFrame(self.virtual_frame, fg_color="transparent")
+        self.virtual_cards_frame.grid(row=0, column=0, sticky="nsew")
+        self.virtual_cards_frame.grid_columnconfigure(0, weight=1)
+        self.virtual_scrollbar = ctk.CTkScrollbar(self.virtual_frame, command=self.on_virtual_scroll)
+        self.virtual_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.bind_all("<MouseWheel>", self.on_virtual_mousewheel, add="+")
+        self.bind_all("<Button-4>", self.on_virtual_mousewheel, add="+")
+        self.bind_all("<Button-5>", self.on_virtual_mousewheel, add="+")
+        # Coming back to the window is when a file may have been changed elsewhere
+        self.bind("<FocusIn>", lambda event: self.check_file_changed(), add="+")
+
+        if self.tracer.enabled:
+            self.start_tracing()
+        self.poll_ui_queue()
+
+        # Try to load default file if exists
+        default_file = os.path.join(os.getcwd(), "examples", "CoSD_SSO_Configuration.json")
+        if os.path.exists(default_file):
+            self.load_config(default_file)
+
+    def start_tracing(self):
+        """Wraps the hot paths with timers and starts the lag heartbeat and overlay."""
+        tracer = self.tracer
+        self.create_config_card = tracer.wrap("create_config_card", self.create_config_card)
+        self.build_card_content = tracer.wrap("build_card_content", self.build_card_content)
+        self.sync_widgets_to_data = tracer.wrap("sync_widgets_to_data", self.sync_widgets_to_data)
+        render = self.render_config_items
+
+        def traced_render():
+            created = tracer.counters.get("widgets_created", 0)
+            destroyed = tracer.counters.get("widgets_destroyed", 0)
+            start = time.perf_counter()
+            render()
+            tracer.record("render_config_items", time.perf_counter() - start,
+                          created=tracer.counters.get("widgets_created", 0) - created,
+                          destroyed=tracer.counters.get("widgets_destroyed", 0) - destroyed)
+            # Run the pending geometry work now so it is timed on its own
+            with tracer.span("layout"):
+                self.update_idletasks()
+        self.render_config_items = traced_render
+
+        self.trace_label = ctk.CTkLabel(self, text="", fg_color="gray20", text_color="white", corner_radius=4, font=ctk.CTkFont(size=11))
+        self.trace_label.place(relx=1.0, rely=1.0, x=-6, y=-6, anchor="se")
+        self.heartbeat(time.perf_counter())
+        self.refresh_trace_overlay()
+
+    def heartbeat(self, expected):
+        # How late this callback ran is how long the event loop was blocked
+        self.tracer.lag(max(0.0, time.perf_counter() - expected))
+        due = time.perf_counter() + HEARTBEAT_MS / 1000
+        self.heartbeat_after_id = self.after(HEARTBEAT_MS, lambda: self.heartbeat(due))
+
+    def refresh_trace_overlay(self):
+        summary = self.tracer.summary()
+        def ms(name, key):
+            return summary.get(name, {}).get(key, 0)
+        self.trace_label.configure(text=(
+            f"lag {ms('event_loop_lag', 'last_ms'):.0f} ms (max {ms('event_loop_lag', 'max_ms'):.0f})"
+            f" | render {ms('render_config_items', 'last_ms'):.0f} ms + layout {ms('layout', 'last_ms'):.0f} ms"
+            f" | sync {ms('sync_widgets_to_data', 'last_ms'):.0f} ms | parse {ms('parse', 'last_ms'):.0f} ms"
+            f" | cards {ms('create_config_card', 'count')}"
+            f" | widgets +{summary.get('widgets_created', 0)} -{summary.get('widgets_destroyed', 0)}"))
+        self.trace_label.lift()
+        self.trace_overlay_after_id = self.after(TRACE_OVERLAY_MS, self.refresh_trace_overlay)
+
+    def analyze_conflicts(self):
+        self.sync_widgets_to_data()
+        lines = format_report(analyze_config(self.config_data, self.picklist_manager), self.picklist_manager)
+        if not lines:
+            messagebox.showinfo("Analyze", "No duplicate or shadowed environments, and every account and region is in the picklists.")
+            return
+        ReportWindow(self, f"Analyze - {len(lines)} findings", lines)
+
+    def open_picklist_manager(self):
+        if self.picklist_window is None or not self.picklist_window.winfo_exists():
+            self.picklist_window = PicklistEditor(self, self.picklist_manager)
+            # Handle closing to clean up reference (optional but good practice)
+            # self.picklist_window.protocol("WM_DELETE_WINDOW", self.on_picklist_close)
+        else:
+            self.picklist_window.lift()
+            self.picklist_window.focus()
+
+
+    def load_config_dialog(self):
+        filename = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")])
+        if filename:
+            if filename in self.tabs:
+                self.switch_tab(filename)
+                return
+            if self.tabs and not self.close_workspace():
+                return
+            self.load_config(filename)
+
+    def open_workspace_dialog(self):
+        directory = filedialog.askdirectory()
+        if directory:
+            self.open_workspace(directory)
+
+    def open_workspace(self, directory):
+        paths = list_config_files(directory)
+        if not paths:
+            messagebox.showinfo("Open Folder", f"No .json or .json5 configs in {directory}")
+            return
+        current = self.filepath
+        if self.tabs:
+            if not self.close_workspace():
+                return
+        elif current and current not in paths and self.is_modified():
+            if not messagebox.askyesno("Unsaved Changes", f"Discard unsaved changes in {os.path.basename(current)}?"):
+                return
+        # Tabs first, so stash_tab keeps the open file's edits when it is part of the folder
+        self.tabs = {path: None for path in paths}
+        self.tab_paths = {os.path.basename(path): path for path in paths}
+        self.tab_bar.configure(values=list(self.tab_paths))
+        self.tab_bar.grid(row=1, column=0, padx=20, pady=(0, 5), sticky="w")
+        self.stash_tab()
+        # Keep the open file if it is part of the folder
+        self.switch_tab(current if current in self.tabs else paths[0])
+
+    def close_workspace(self):
+        """Leaves workspace mode; returns False if the user keeps it to save edits first."""
+        current = self.filepath
+        self.stash_tab()
+        unsaved = [os.path.basename(path) for path, session in self.tabs.items() if session is not None]
+        if unsaved and not messagebox.askyesno("Unsaved Changes", "Discard unsaved changes in " + ", ".join(unsaved) + "?"):
+            # Put back the tab that was showing
+            if current:
+                self.switch_tab(current)
+            return False
+        self.tabs = {}
+        self.tab_paths = {}
+        self.tab_bar.grid_remove()
+        return True
+
+    def is_modified(self):
+        self.record_history()
+        return not same_snapshot(self.history.current, self.saved_snapshot)
+
+    def stash_tab(self):
+        """Puts the open file away; only files with unsaved edits keep their session."""
+        if not self.filepath or self.pending_blocks:
+            return
+        session = None
+        if self.is_modified():
+            session = {
+                "config_data": self.config_data, "block_states": self.block_states,
+                "block_index": self.block_index, "history": self.history, "saved_hash": self.saved_hash,
+                "saved_snapshot": self.saved_snapshot, "file_stat": self.file_stat, "merge_base": self.merge_base,
+            }
+        if self.filepath in self.tabs:
+            self.tabs[self.filepath] = session
+        # Release the cards while their block states are still current
+        self.config_data = []
+        self.selected_blocks = {}
+        self.dirty_blocks = {}
+        self.render_config_items()
+        self.filepath = None
+
+    def switch_tab(self, path):
+        if path == self.filepath:
+            return
+        self.stash_tab()
+        self.tab_bar.set(os.path.basename(path))
+        session = self.tabs.get(path)
+        if session is not None:
+            try:
+                changed = stat_key(path) != session["file_stat"]
+            except OSError:
+                changed = False # deleted meanwhile, the unsaved edits can still be saved back
+            if not changed or not messagebox.askyesno(
+                    "File Changed", f"{os.path.basename(path)} changed on disk. Reload it and discard your unsaved changes?"):
+                self.restore_tab(path, session)
+                return
+            self.tabs[path] = None
+        # Unchanged files come straight from the parse cache
+        self.load_config(path)
+
+    def restore_tab(self, path, session):
+        self.load_cancel.set()
+        self.load_generation += 1
+        self.hide_load_progress()
+        self.pending_blocks = []
+        self.filepath = path
+        self.config_data = session["config_data"]
+        self.block_states = session["block_states"]
+        self.block_index = session["block_index"]
+        self.history = session["history"]
+        self.saved_hash = session["saved_hash"]
+        self.saved_snapshot = session["saved_snapshot"]
+        self.file_stat = session["file_stat"]
+        self.merge_base = session["merge_base"]
+        self.theme_blocks_btn.configure(text="Theme All")
+        self.title(f"Configuration Tool - {os.path.basename(path)}")
+        self.update_edit_buttons()
+        self.render_config_items()
+
+    def check_file_changed(self):
+        # One stat per focus change, the file is only read again when it changed
+        if not self.filepath or self.pending_blocks or self.file_stat is None:
+            return
+        try:
+            current = stat_key(self.filepath)
+        except OSError:
+            return
+        if current == self.file_stat:
+            return
+        # Unsaved edits stay put, saving merges the changes on disk into them
+        if not self.is_modified():
+            self.load_config(self.filepath)
+
+    def run_in_background(self, work, on_done, on_error):
+        """Runs work() on a daemon thread; the callbacks run later on the Tk thread."""
+        def worker():
+            try:
+                result = work()
+            except Exception as e:
+                self.ui_queue.put((on_error, e, None))
+            else:
+                # A failure handling the result is reported like one doing the work
+                self.ui_queue.put((on_done, result, on_error))
+        threading.Thread(target=worker, daemon=True).start()
+
+    def poll_ui_queue(self):
+        try:
+            while True:
+                callback, arg, on_error = self.ui_queue.get_nowait()
+                # Each callback on its own, one failure must not stop the results after it
+                try:
+                    callback(arg)
+                except Exception as e:
+                    if on_error is not None:
+                        on_error(e)
+                    else:
+                        messagebox.showerror("Error", str(e))
+        except queue.Empty:
+            pass
+        finally:
+            self.poll_after_id = self.after(50, self.poll_ui_queue)
+
+    def load_config(self, filepath):
+        # A new load supersedes any load still running
+        self.load_cancel.set()
+        self.load_cancel = threading.Event()
+        self.load_generation += 1
+        generation = self.load_generation
+        cancel_event = self.load_cancel
+
+        self.load_progress.set(0)
+        self.load_progress.pack(side="left", padx=10)
+        self.cancel_load_btn.pack(side="left", padx=5)
+
+        def report_progress(fraction):
+            self.ui_queue.put((lambda f: self.set_load_progress(generation, f), fraction, None))
+
+        def on_error(e):
+            if generation != self.load_generation:
+                return
+            if isinstance(e, LoadCancelled):
+                self.hide_load_progress()
+            else:
+                self.load_failed(e)
+
+        self.run_in_background(
+            lambda: read_config_in_background(filepath, cancel_event, report_progress, self.tracer, self.parse_cache),
+            lambda result: self.on_config_parsed(generation, filepath, *result),
+            on_error)
+
+    def set_load_progress(self, generation, fraction):
+        if generation == self.load_generation:
+            self.load_progress.set(fraction)
+
+    def hide_load_progress(self):
+        self.load_progress.pack_forget()
+        self.cancel_load_btn.pack_forget()
+
+    def load_failed(self, e):
+        # Keep the unrendered blocks in the data, so saving can't drop them from the file
+        self.config_data.extend(self.pending_blocks)
+        self.pending_blocks = []
+        self.hide_load_progress()
+        self.update_edit_buttons()
+        messagebox.showerror("Error", f"Failed to load file: {e}")
+
+    def cancel_load(self):
+        self.load_cancel.set()
+        self.load_generation += 1
+        self.hide_load_progress()
+
+    def on_config_parsed(self, generation, filepath, data, digest, file_stat):
+        if generation != self.load_generation:
+            return
+        if not isinstance(data, list):
+            self.hide_load_progress()
+            messagebox.showerror("Error", "Failed to load file: expected a list of blocks")
+            return
+
+        # Parsing is done, the remaining card work happens here on the Tk thread
+        self.cancel_load_btn.pack_forget()
+        self.dirty_blocks = {} # edits to the replaced blocks are gone with them
+        # Fresh objects rather than resets, stashed tabs may hold the old ones
+        self.block_index = BlockIndex(self.picklist_manager)
+        self.block_index.rebuild(data)
+        self.block_states = {}
+        self.history = ConfigHistory()
+        self.merge_base = self.freeze_blocks(data)
+        self.history.reset(self.merge_base)
+        self.saved_snapshot = self.history.current
+        self.update_history_buttons()
+        self.selected_blocks = {}
+        self.theme_blocks_btn.configure(text="Theme All")
+        self.filepath = filepath
+        self.saved_hash = digest
+        self.file_stat = file_stat
+        if filepath in self.tabs:
+            self.tabs[filepath] = None
+            self.tab_bar.set(os.path.basename(filepath))
+        self.title(f"Configuration Tool - {os.path.basename(filepath)}")
+        if len(data) > VIRTUAL_LIST_THRESHOLD:
+            # The windowed view only builds a handful of cards anyway
+            self.config_data = data
+            self.pending_blocks = []
+        else:
+            self.config_data = []
+            self.pending_blocks = data
+        self.update_edit_buttons()
+        self.render_config_items()
+        self.stream_cards(generation)
+
+    def stream_cards(self, generation):
+        if generation != self.load_generation:
+            return
+        if self.pending_blocks:
+            total = len(self.config_data) + len(self.pending_blocks)
+            self.config_data.extend(self.pending_blocks[:RENDER_BATCH_SIZE])
+            del self.pending_blocks[:RENDER_BATCH_SIZE]
+            try:
+                self.render_config_items()
+            except Exception as e:
+                self.load_failed(e)
+                return
+            self.load_progress.set(0.5 + 0.5 * len(self.config_data) / total)
+            self.after(1, lambda: self.stream_cards(generation))
+            return
+
+        self.hide_load_progress()
+        self.update_edit_buttons()
+        print(f"Loaded {self.filepath}")
+
+    def add_config_block(self):
+        if self.pending_blocks:
+            return
+        # Sync current state before adding/re-rendering to preserve edits
+        self.record_history()
+        
+        block = new_block()
+        self.config_data.append(block)
+        self.block_index.add(block)
+        self.record_history()
+        self.render_config_items()
+        
+        # Scroll to bottom (optional, but good UX)
+        if self.virtual_mode:
+            self.virtual_first = max(0, len(self.visible_blocks()) - VIRTUAL_WINDOW_SIZE)
+            self.render_virtual_window()
+        else:
+            self.scrollable_frame._parent_canvas.yview_moveto(1.0)
+
+    def expand_all(self):
+        self.sync_widgets_to_data()
+        for item in self.config_data:
+            self.state_of(item).collapsed = False
+        self.render_config_items()
+
+    def collapse_all(self):
+        self.sync_widgets_to_data()
+        for item in self.config_data:
+            self.state_of(item).collapsed = True
+        self.render_config_items()
+
+    def state_of(self, item):
+        state = self.block_states.get(id(item))
+        if state is None:
+            state = self.block_states[id(item)] = BlockState(item)
+        return state
+
+    def drop_state(self, item):
+        self.block_states.pop(id(item), None)
+
+    def theme_blocks_action(self):
+        if self.pending_blocks:
+            return
+        # Seeded from account/region, so the same blocks always get the same colors
+        self.record_history()
+        blocks = [item for item in self.config_data if id(item) in self.selected_blocks] or self.config_data
+        assign_seeded_themes(blocks)
+        for item in blocks:
+            self.block_index.update(item)
+        self.record_history()
+        self.render_config_items()
+
+    def freeze_blocks(self, blocks):
+        # Each block keeps its last frozen view, reused while its values are unchanged
+        frozen = []
+        for item in blocks:
+            state = self.state_of(item)
+            state.frozen = freeze_block(item, state.frozen)
+            frozen.append(state.frozen)
+        return frozen
+
+    def record_history(self):
+        """Syncs pending edits and records them as an undo step if anything changed."""
+        self.sync_widgets_to_data()
+        # A half-streamed load isn't a state worth returning to
+        if self.pending_blocks:
+            return
+        if self.history.commit(self.freeze_blocks(self.config_data)):
+            self.update_history_buttons()
+
+    def update_history_buttons(self):
+        # Nothing to undo into while a load is still streaming in
+        streaming = bool(self.pending_blocks)
+        self.undo_btn.configure(state="normal" if self.history.can_undo() and not streaming else "disabled")
+        self.redo_btn.configure(state="normal" if self.history.can_redo() and not streaming else "disabled")
+
+    def update_edit_buttons(self):
+        """Save and whole-config edits wait until a streamed load has every block."""
+        state = "disabled" if self.pending_blocks else "normal"
+        for button in (self.save_button, self.add_block_btn, self.theme_blocks_btn):
+            button.configure(state=state)
+        self.update_history_buttons()
+
+    def undo(self):
+        if self.pending_blocks:
+            return
+        # Typed edits not yet recorded become their own step, so undo reverts them first
+        self.record_history()
+        self.restore_snapshot(self.history.undo())
+
+    def redo(self):
+        if self.pending_blocks:
+            return
+        self.record_history()
+        self.restore_snapshot(self.history.redo())
+
+    def restore_snapshot(self, frozen_blocks):
+        if frozen_blocks is None:
+            return
+        # Blocks whose frozen view is in the snapshot are unchanged and keep their cards
+        live = {id(self.state_of(item).frozen): item for item in self.config_data}
+        restored = []
+        for frozen in frozen_blocks:
+            item = live.pop(id(frozen), None)
+            if item is None:
+                # Values are shared with the snapshot, safe since edits replace rather than mutate them
+                item = dict(frozen)
+                self.state_of(item).frozen = frozen
+                self.block_index.add(item)
+            restored.append(item)
+        for item in live.values():
+            self.block_index.remove(item)
+            self.set_block_selected(item, False)
+            self.drop_state(item)
+        self.config_data = restored
+        self.dirty_blocks = {}
+        self.update_history_buttons()
+        self.render_config_items()
+
+    def set_block_selected(self, item, selected):
+        if selected:
+            self.selected_blocks[id(item)] = item
+        else:
+            self.selected_blocks.pop(id(item), None)
+        count = len(self.selected_blocks)
+        self.theme_blocks_btn.configure(text=f"Theme Selected ({count})" if count else "Theme All")
+
+    def render_config_items(self):
+        """Reconciles cards with config_data; only added, removed or changed blocks touch widgets."""
+        use_virtual = len(self.config_data) > VIRTUAL_LIST_THRESHOLD
+        if use_virtual != self.virtual_mode:
+            self.set_virtual_mode(use_virtual)
+        # Edits may have changed what matches
+        query = self.filter_entry.get().strip()
+        self.filter_matches = self.block_index.search(query) if query else None
+
+        if self.virtual_mode:
+            self.render_virtual_window()
+            return
+
+        live_keys = {id(item) for item in self.config_data}
+
+        # Destroy cards whose block is gone
+        for key in [k for k in self.cards if k not in live_keys]:
+            self.release_card(self.cards.pop(key))
+
+        for idx, item in enumerate(self.config_data):
+            card = self.cards.get(id(item))
+            if card is None:
+                card = self.cards[id(item)] = self.create_config_card(idx, item)
+            else:
+                self.update_config_card(card, idx)
+            self.apply_card_visibility(card)
+
+    def visible_blocks(self):
+        if self.filter_matches is None:
+            return self.config_data
+        return [item for item in self.config_data if id(item) in self.filter_matches]
+
+    def apply_filter(self):
+        # Index must see pending widget edits before matching
+        self.sync_widgets_to_data()
+        query = self.filter_entry.get().strip()
+        self.filter_matches = self.block_index.search(query) if query else None
+        if self.virtual_mode:
+            self.virtual_first = 0
+            self.render_virtual_window()
+        else:
+            # Show/hide existing cards, nothing is rebuilt
+            for card in self.cards.values():
+                self.apply_card_visibility(card)
+
+    def apply_card_visibility(self, card):
+        hidden = self.filter_matches is not None and id(card["item"]) not in self.filter_matches
+        if hidden != card.get("hidden", False):
+            card["hidden"] = hidden
+            if hidden:
+                card["frame"].grid_remove()
+            else:
+                card["frame"].grid(row=card["row"])
+
+    def set_virtual_mode(self, enabled):
+        # Cards belong to the old container, drop them all
+        for card in list(self.cards.values()) + self.virtual_slots:
+            self.release_card(card)
+        self.cards = {}
+        self.virtual_slots = []
+        self.virtual_first = 0
+        self.virtual_mode = enabled
+
+        if enabled:
+            self.scrollable_frame.grid_remove()
+            self.virtual_frame.grid(row=3, column=0, padx=20, pady=10, sticky="nsew")
+            self.cards_frame = self.virtual_cards_frame
+        else:
+            self.virtual_frame.grid_remove()
+            self.scrollable_frame.grid()
+            self.cards_frame = self.scrollable_frame
+
+    def render_virtual_window(self):
+        """Shows VIRTUAL_WINDOW_SIZE blocks from virtual_first, recycling the existing cards."""
+        blocks = self.visible_blocks()
+        count = len(blocks)
+        self.virtual_count = count
+        self.virtual_first = max(0, min(self.virtual_first, count - VIRTUAL_WINDOW_SIZE))
+        window = blocks[self.virtual_first:self.virtual_first + VIRTUAL_WINDOW_SIZE]
+
+        # Cards still showing a block inside the window stay bound to it
+        bound = {id(card["item"]): card for card in self.virtual_slots}
+        window_keys = {id(item) for item in window}
+        free = [card for key, card in bound.items() if key not in window_keys]
+
+        slots = []
+        for row, item in enumerate(window):
+            card = bound.get(id(item))
+            if card is None and free:
+                card = free.pop()
+                self.bind_card(card, item)
+            if card is None:
+                card = self.create_config_card(row, item)
+            else:
+                self.update_config_card(card, row)
+            slots.append(card)
+
+        for card in free:
+            self.release_card(card)
+        self.virtual_slots = slots
+
+        if count:
+            self.virtual_scrollbar.set(self.virtual_first / count, min(1.0, (self.virtual_first + len(window)) / count))
+        else:
+            self.virtual_scrollbar.set(0.0, 1.0)
+
+    def scroll_virtual_window(self, first):
+        first = max(0, min(first, self.virtual_count - VIRTUAL_WINDOW_SIZE))
+        if first != self.virtual_first:
+            self.virtual_first = first
+            self.render_virtual_window()
+
+    def on_virtual_scroll(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if not self.virtual_mode or not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_virtual_window(int(float(args[1]) * self.virtual_count))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= VIRTUAL_WINDOW_SIZE
+            self.scroll_virtual_window(self.virtual_first + step)
+
+    def on_virtual_mousewheel(self, event):
+        if not self.virtual_mode or not str(event.widget).startswith(str(self.virtual_frame)):
+            return
+        if event.num == 4 or event.delta > 0:
+            self.scroll_virtual_window(self.virtual_first - 1)
+        elif event.num == 5 or event.delta < 0:
+            self.scroll_virtual_window(self.virtual_first + 1)
+
+    def bind_card(self, card, item):
+        """Recycles a card to display another block, moving the widget refs over."""
+        old_item = card["item"]
+        self.sync_block(old_item)
+        # None when the card was only ever collapsed and has no content widgets yet
+        old_state, state = self.state_of(old_item), self.state_of(item)
+        state.env_container, state.style_widgets = old_state.env_container, old_state.style_widgets
+        old_state.env_container = old_state.style_widgets = None
+        state.env_is_dict = isinstance(item.get("env"), dict)
+        card["item"] = item
+        card["signature"] = None # Force a refresh
+
+    def release_card(self, card):
+        # Typed edits would be lost with the widgets, read them first
+        if self.dirty_blocks.pop(id(card["item"]), None) is not None:
+            self.sync_block(card["item"])
+        state = self.block_states.get(id(card["item"]))
+        if state is not None:
+            state.env_container = state.style_widgets = None
+        card["frame"].destroy()
+
+    def card_signature(self, item):
+        # Cheap fingerprint of the data a card displays, account names come from the picklists
+        return (self.picklist_manager.version, repr(item.get("env")), repr(item.get("style")))
+
+    def get_card_header_text(self, item):
+        # Logic to construct header text: Name (ID) - Region
+        envs = get_envs(item)
+            
+        # Collect unique info for summary
+        summary_parts = []
+        if envs:
+            for env in envs:
+                acc_id = env.get("account", "")
+                region = env.get("region", "")
+                acc_name = self.picklist_manager.get_account_name(acc_id)
+                
+                part = ""
+                if acc_name:
+                    part = f"{acc_name} ({acc_id})"
+                elif acc_id:
+                    part = f"{acc_id}"
+                
+                if region:
+                    if part:
+                         part += f" - {region}"
+                    else:
+                         part = region
+                
+                if part:
+                    summary_parts.append(part)
+        
+        if summary_parts:
+            # Join with newlines for multiple environments
+            return "\n".join(summary_parts)
+        return "Empty Configuration"
+
+    def find_block_index(self, item):
+        # Blocks are matched by identity, equal dicts may appear more than once
+        for idx, candidate in enumerate(self.config_data):
+            if candidate is item:
+                return idx
+        return -1
+
+    def create_config_card(self, index, item):
+        frame = ctk.CTkFrame(self.cards_frame)
+        frame.grid(row=index, column=0, padx=10, pady=10, sticky="ew")
+        frame.grid_columnconfigure(1, weight=1)
+
+        card = {"item": item, "frame": frame, "row": index}
+
+        # Widget edit events mark the block so sync only reads edited cards
+        def mark_dirty(*_):
+            self.dirty_blocks[id(card["item"])] = card["item"]
+        card["mark_dirty"] = mark_dirty
+
+        # Styled Header
+        header_frame = ctk.CTkFrame(frame, fg_color=("gray85", "gray25"), corner_radius=6)
+        header_frame.grid(row=0, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        
+        # Collapse/Expand Toggle
+        is_collapsed = self.state_of(item).collapsed
+        toggle_char = "▶" if is_collapsed else "▼"
+        
+        def toggle_collapse():
+            state = self.state_of(card["item"])
+            state.collapsed = not state.collapsed
+            self.set_card_collapsed(card, state.collapsed)
+        
+        toggle_btn = ctk.CTkButton(header_frame, text=toggle_char, width=30, fg_color="transparent", text_color=("black", "white"), hover_color=("gray75", "gray35"), command=toggle_collapse)
+        toggle_btn.pack(side="left", padx=(5,0))
+        card["toggle_btn"] = toggle_btn
+
+        # Selection for bulk actions like Theme Selected
+        select_var = tk.BooleanVar(value=id(item) in self.selected_blocks)
+        select_check = ctk.CTkCheckBox(header_frame, text="", width=24, variable=select_var, command=lambda: self.set_block_selected(card["item"], select_var.get()))
+        select_check.pack(side="left", padx=(5,0))
+        card["select_var"] = select_var
+
+        card_label = ctk.CTkLabel(header_frame, text=self.get_card_header_text(item), font=ctk.CTkFont(size=14, weight="bold"))
+        card_label.pack(side="left", padx=10, pady=5)
+        card["label"] = card_label
+        
+        # Add Delete Block Button
+        def delete_block():
+            if self.pending_blocks:
+                return
+            if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this block?"):
+                self.record_history()
+                idx = self.find_block_index(card["item"])
+                if idx >= 0:
+                    del self.config_data[idx]
+                self.block_index.remove(card["item"])
+                self.set_block_selected(card["item"], False)
+                self.record_history()
+                self.drop_state(card["item"])
+                self.render_config_items()
+
+        del_btn = ctk.CTkButton(header_frame, text="Delete Block", width=80, fg_color="darkred", hover_color="#800000", command=delete_block)
+        del_btn.pack(side="right", padx=10, pady=5)
+
+        # Collapsed cards are just the header, the content is built on first expand
+        card["content"] = None
+        card["collapsed"] = is_collapsed
+        if not is_collapsed:
+            self.build_card_content(card)
+
+        card["signature"] = self.card_signature(item)
+        return card
+
+    def build_card_content(self, card):
+        """Creates the env and style widgets of a card, below its header."""
+        item = card["item"]
+        # Reset widget tracking for this card to avoid stale references
+        self.state_of(item).style_widgets = []
+
+        content_frame = ctk.CTkFrame(card["frame"], fg_color="transparent")
+        content_frame.grid(row=1, column=0, columnspan=2, sticky="ew")
+        card["content"] = content_frame
+        
+        # Environment Section
+        env_frame = ctk.CTkFrame(content_frame)
+        env_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(env_frame, text="Environments", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=5, pady=2)
+        
+        self.create_env_rows(env_frame, card)
+
+        add_env_btn = ctk.CTkButton(env_frame, text="+ Add Environment", width=120, command=lambda: self.add_single_env_row(self.state_of(card["item"]).env_container, {}))
+        add_env_btn.pack(anchor="w", padx=5, pady=5)
+
+
+        # Style Section
+        style_frame = ctk.CTkFrame(content_frame)
+        style_frame.pack(fill="x", padx=10, pady=5)
+        ctk.CTkLabel(style_frame, text="Styles", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=5, pady=2)
+
+        
+        # Update data model then re-render; only this card changes
+        def generate_theme_action():
+            if self.pending_blocks:
+                return
+            self.record_history()
+            primary, secondary = self.generate_harmonious_colors(exclude=card["item"])
+            set_theme(card["item"], primary, secondary)
+            self.block_index.update(card["item"])
+            self.record_history()
+            self.render_config_items()
+
+        gen_btn = ctk.CTkButton(style_frame, text="Generate Theme", fg_color="purple", hover_color="purple", command=generate_theme_action)
+        gen_btn.pack(anchor="w", padx=5, pady=5)
+        
+        # Navigation Background Color
+        self.create_color_row(style_frame, card, "navigationBackgroundColor", "Nav Bg Color")
+        # Account Menu Button Background Color
+        self.create_color_row(style_frame, card, "accountMenuButtonBackgroundColor", "Menu Button Bg")
+
+    def update_config_card(self, card, index):
+        """Brings an existing card in line with its block, in place."""
+        item = card["item"]
+
+        if card["row"] != index:
+            card["row"] = index
+            # Hidden cards pick up their row when shown again
+            if not card.get("hidden", False):
+                card["frame"].grid(row=index)
+
+        signature = self.card_signature(item)
+        if signature != card["signature"]:
+            picklists_changed = signature[0] != card["signature"][0]
+            # Account combos show picklist names and get rebuilt from the block, so take in edits first
+            if picklists_changed and self.dirty_blocks.pop(id(item), None) is not None:
+                self.sync_block(item)
+                signature = self.card_signature(item)
+            card["label"].configure(text=self.get_card_header_text(item))
+            # Unbuilt content reads the block when it is first expanded
+            if card["content"] is not None:
+                self.refresh_style_widgets(item)
+                if picklists_changed:
+                    self.rebuild_env_rows(item)
+                elif self.read_env_rows(self.state_of(item).env_container) != self.get_env_pairs(item):
+                    self.rebuild_env_rows(item)
+            card["signature"] = signature
+
+        collapsed = self.state_of(item).collapsed
+        if collapsed != card["collapsed"]:
+            self.set_card_collapsed(card, collapsed)
+
+        selected = id(item) in self.selected_blocks
+        if card["select_var"].get() != selected:
+            card["select_var"].set(selected)
+
+    def set_card_collapsed(self, card, collapsed):
+        card["collapsed"] = collapsed
+        if collapsed:
+            card["toggle_btn"].configure(text="▶")
+            if card["content"] is not None:
+                # Destroy rather than hide, a collapsed card is just its header
+                if self.dirty_blocks.pop(id(card["item"]), None) is not None:
+                    self.sync_block(card["item"])
+                state = self.state_of(card["item"])
+                state.env_container = state.style_widgets = None
+                card["content"].destroy()
+                card["content"] = None
+        else:
+            card["toggle_btn"].configure(text="▼")
+            if card["content"] is None:
+                self.build_card_content(card)
+
+    def refresh_style_widgets(self, item):
+        styles = item.get("style", {})
+        for key, entry in self.state_of(item).style_widgets or []:
+            value = styles.get(key, "#ffffff")
+            if entry.get() != value:
+                entry.delete(0, "end")
+                entry.insert(0, value)
+                entry.color_btn.configure(fg_color=value)
+
+    def get_env_pairs(self, item):
+        return [(env.get("account", ""), env.get("region", "")) for env in get_envs(item)]
+
+    def read_env_rows(self, container):
+        pairs = []
+        for row in container.winfo_children():
+            if hasattr(row, "acc_widget") and hasattr(row, "reg_widget"):
+                acc_id = self.picklist_manager.get_account_id_from_display(row.acc_widget.get().strip())
+                reg = row.reg_widget.get().strip()
+                # Blank rows are dropped on sync, ignore them here too
+                if acc_id or reg:
+                    pairs.append((acc_id, reg))
+        return pairs
+
+    def rebuild_env_rows(self, item):
+        container = self.state_of(item).env_container
+        for row in container.winfo_children():
+            row.destroy()
+        self.populate_env_rows(container, item)
+
+    def create_color_row(self, parent, card, key, label_text):
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        row.pack(fill="x", padx=5, pady=2)
+        
+        ctk.CTkLabel(row, text=label_text, width=150, anchor="w").pack(side="left")
+        
+        item_ref = card["item"]
+        current_color = item_ref.get("style", {}).get(key, "#ffffff")
+        
+        # Color Preview/Button
+        color_btn = ctk.CTkButton(row, text="", width=30, height=30, fg_color=current_color, border_width=2, border_color="gray")
+        color_btn.pack(side="left", padx=5)
+        
+        # Entry
+        color_var = tk.StringVar(value=current_color)
+        entry = ctk.CTkEntry(row, width=100, textvariable=color_var)
+        entry.pack(side="left", padx=5)
+        entry.color_btn = color_btn
+        color_var.trace_add("write", card["mark_dirty"])
+        
+        # Update function
+        def update_color(c):
+            entry.delete(0, "end")
+            entry.insert(0, c)
+            color_btn.configure(fg_color=c)
+            # Write to whichever block the card currently shows, replacing the style dict
+            # so history snapshots holding the old one stay intact
+            item = card["item"]
+            item["style"] = dict(item.get("style", {}), **{key: c})
+            self.record_history()
+
+        def open_picker():
+            color = colorchooser.askcolor(initialcolor=entry.get())
+            if color[1]:
+                update_color(color[1])
+
+        color_btn.configure(command=open_picker)
+        
+        # Store refs to read values on save
+        state = self.state_of(item_ref)
+        if state.style_widgets is None:
+            state.style_widgets = []
+        state.style_widgets.append((key, entry))
+
+    def create_env_rows(self, parent, card):
+        item = card["item"]
+        container = ctk.CTkFrame(parent, fg_color="transparent")
+        container.pack(fill="x", padx=0, pady=0)
+        container.on_change = card["mark_dirty"]
+        self.state_of(item).env_container = container
+        self.populate_env_rows(container, item)
+
+    def populate_env_rows(self, container, item):
+        env_data = item.get("env", [])
+        if isinstance(env_data, dict):
+            env_data = [env_data]
+            self.state_of(item).env_is_dict = True
+        else:
+            self.state_of(item).env_is_dict = False
+
+        if not env_data:
+            # Check if it was empty list or what
+            pass 
+
+        for env in env_data:
+            self.add_single_env_row(container, env)
+
+    def add_single_env_row(self, parent, env_val):
+        row = ctk.CTkFrame(parent)
+        row.pack(fill="x", pady=2)
+        
+        # Account, the dropdown only ever holds the top type-ahead matches
+        acc_values = self.picklist_manager.search_accounts("")
+        current_acc_id = env_val.get("account", "")
+        # Match ID to existing display name, else use ID
+        current_acc_display = self.picklist_manager.get_account_display(current_acc_id)
+        
+        # If the current ID not in list, add it to list temporarily for display? 
+        # Or just show it. Combobox allows custom values if not state="readonly".
+        # We leave it default so users can type new IDs too.
+        
+        acc_var = tk.StringVar(value=current_acc_display)
+        acc_combo = ctk.CTkComboBox(row, values=acc_values, width=300, variable=acc_var)
+        acc_combo.set(current_acc_display)
+        acc_combo.pack(side="left", padx=5)
+        row.acc_widget = acc_combo
+        acc_combo.bind("<KeyRelease>", lambda event: acc_combo.configure(values=self.picklist_manager.search_accounts(acc_combo.get())))
+        
+        # Region
+        reg_values = self.picklist_manager.search_regions("")
+        current_reg = env_val.get("region", "")
+        
+        reg_var = tk.StringVar(value=current_reg)
+        reg_combo = ctk.CTkComboBox(row, values=reg_values, width=150, variable=reg_var)
+        reg_combo.set(current_reg)
+        reg_combo.pack(side="left", padx=5)
+        row.reg_widget = reg_combo
+        reg_combo.bind("<KeyRelease>", lambda event: reg_combo.configure(values=self.picklist_manager.search_regions(reg_combo.get())))
+
+        # Traced after the initial values are set so building a row isn't an edit
+        on_change = getattr(parent, "on_change", None)
+        if on_change:
+            acc_var.trace_add("write", on_change)
+            reg_var.trace_add("write", on_change)
+        
+        # Delete button
+        def delete_row():
+            row.destroy()
+            if on_change:
+                on_change()
+            self.record_history()
+            
+        del_btn = ctk.CTkButton(row, text="X", width=30, fg_color="red", command=delete_row)
+        del_btn.pack(side="right", padx=5)
+
+
+    def save_config(self):
+        # A partly streamed config would overwrite the file without its remaining blocks
+        if not self.filepath or self.pending_blocks:
+            return
+
+        # Confirm before saving
+        if not messagebox.askyesno("Confirm Save", f"Are you sure you want to save changes to {os.path.basename(self.filepath)}?"):
+            return
+
+        # Gather data from widgets
+        try:
+            # Frozen views, edits made while the worker serializes replace values rather than mutate them
+            clean_data = self.get_clean_config_data()
+            self.record_history()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save: {e}")
+            return
+
+        filepath = self.filepath
+        strict = self.strict_json_var.get()
+        compact = self.compact_output_var.get()
+        known_hash = self.saved_hash
+        known_stat = self.file_stat
+        base = self.merge_base
+        snapshot = self.history.current
+        cache = self.parse_cache
+
+        def write():
+            # Someone else saved since we read the file: merge their changes instead of overwriting them
+            if known_stat is not None and os.path.exists(filepath) and stat_key(filepath) != known_stat:
+                key = stat_key(filepath)
+                with open(filepath, 'r') as f:
+                    disk_text = f.read()
+                disk_hash = content_hash(disk_text)
+                if disk_hash != known_hash:
+                    theirs = loads_json(disk_text)
+                    if not isinstance(theirs, list):
+                        raise ValueError(f"{os.path.basename(filepath)} on disk is not a list of blocks, not merging")
+                    theirs = clean_config(theirs)
+                    merged, conflicts = merge_configs(base, clean_data, theirs)
+                    return "merged", (merged, conflicts, theirs, disk_hash, key), None
+
+            text = serialize_config(clean_data, strict=strict, compact=compact)
+            digest = content_hash(text)
+            # The next save merges against what is on disk, which is the compacted blocks
+            written = compact_config(clean_data) if compact else clean_data
+            # Identical bytes are already on disk
+            if digest == known_hash:
+                return "unchanged", None, written
+            write_file_atomic(filepath, text)
+            key = stat_key(filepath)
+            # Compact output parses back to different blocks, let the next open read it
+            if compact:
+                cache.discard(filepath)
+            else:
+                cache.put(filepath, key, clean_data, digest)
+            return "saved", (digest, key), written
+
+        def on_saved(result):
+            self.save_button.configure(state="normal")
+            status, detail, written = result
+            if status == "merged":
+                self.on_save_merged(filepath, *detail)
+                return
+            # The file matches this snapshot now, whether or not it was rewritten
+            saved = {"saved_snapshot": snapshot, "merge_base": written}
+            if detail is not None:
+                saved["saved_hash"], saved["file_stat"] = detail
+            # The widgets already show this data, no reload needed
+            if filepath == self.filepath:
+                self.saved_snapshot = snapshot
+                self.merge_base = written
+                if detail is not None:
+                    self.saved_hash, self.file_stat = detail
+            elif self.tabs.get(filepath) is not None:
+                # Saved, then switched to another tab before the write finished
+                self.tabs[filepath].update(saved)
+            if status == "unchanged":
+                messagebox.showinfo("Success", "No changes to save, the file is already up to date.")
+                return
+            messagebox.showinfo("Success", "Configuration saved successfully!")
+
+        def on_error(e):
+            self.save_button.configure(state="normal")
+            messagebox.showerror("Error", f"Failed to save: {e}")
+
+        self.save_button.configure(state="disabled")
+        self.run_in_background(write, on_saved, on_error)
+
+    def on_save_merged(self, filepath, merged, conflicts, theirs, disk_hash, file_stat):
+        """Shows the merge of our edits with a newer file on disk; the user reviews it and saves again."""
+        name = os.path.basename(filepath)
+        if filepath != self.filepath:
+            messagebox.showwarning("Not Saved", f"{name} changed on disk, nothing was written. Open its tab and save again to merge.")
+            return
+        # The disk version is the base for the next merge, and what saved_hash now describes
+        self.merge_base = theirs
+        self.saved_hash = disk_hash
+        self.file_stat = file_stat
+        self.saved_snapshot = ()
+        self.record_history()
+        self.restore_snapshot(merged)
+        self.record_history()
+        if not conflicts:
+            messagebox.showinfo("Merged", f"{name} changed on disk since it was loaded. Those changes have been merged with yours, nothing was written yet: review and Save again.")
+            return
+        lines = [f"{name} changed on disk since it was loaded. Those changes have been merged with yours,",
+                 "nothing was written yet. Where both sides changed the same value yours was kept:", ""]
+        ReportWindow(self, f"Merge - {len(conflicts)} conflicts", lines + format_conflicts(conflicts) + ["", "Review the blocks, then Save again."])
+
+    def sync_widgets_to_data(self):
+        """Syncs data from edited widgets to the config_data model."""
+        # Only blocks whose widgets fired an edit event need reading
+        dirty = self.dirty_blocks
+        self.dirty_blocks = {}
+        for item in dirty.values():
+            self.sync_block(item)
+
+    def sync_block(self, item):
+        state = self.state_of(item)
+        # Update Env
+        if state.env_container is not None:
+            container = state.env_container
+            # Verify container still exists using string check on widget representation or try/except
+            try:
+                if not container.winfo_exists():
+                    return
+            except Exception:
+                return
+
+            new_envs = []
+            for row in container.winfo_children():
+                if hasattr(row, "acc_widget") and hasattr(row, "reg_widget"):
+                     try:
+                         acc_display = row.acc_widget.get().strip()
+                         reg = row.reg_widget.get().strip()
+                         
+                         acc_id = self.picklist_manager.get_account_id_from_display(acc_display)
+                         if acc_id or reg:
+                             new_envs.append({"account": acc_id, "region": reg})
+                     except Exception:
+                         # Widget might be destroyed
+                         pass
+            
+            new_env = new_envs[0] if state.env_is_dict and len(new_envs) == 1 else new_envs
+            # Only replace on change so history can keep sharing the old value
+            if new_env != item.get("env"):
+                item["env"] = new_env
+        
+        # Update Styles, into a new dict since snapshots may hold the current one
+        if state.style_widgets is not None:
+            style = dict(item.get("style", {}))
+            for key, entry in state.style_widgets:
+                try:
+                     if entry.winfo_exists():
+                        style[key] = entry.get()
+                except Exception:
+                    pass
+            if style != item.get("style"):
+                item["style"] = style
+
+        self.block_index.update(item)
+
+    def get_clean_config_data(self):
+        """Blocks as they will be saved, safe to hand to a worker thread.
+
+        UI state lives in block_states, so this is the frozen views history
+        already keeps: only blocks edited since the last freeze are copied.
+        """
+        # First ensure model is up to date
+        self.sync_widgets_to_data()
+        
+        return self.freeze_blocks(self.config_data)
+
+    def copy_to_clipboard(self):
+        try:
+            clean_data = self.get_clean_config_data()
+            # Serialize same as save
+            compact = self.compact_output_var.get()
+            json_str = serialize_config(clean_data, strict=self.strict_json_var.get(), compact=compact)
+            self.clipboard_clear()
+            self.clipboard_append(json_str)
+            message = "Configuration copied to clipboard!"
+            if compact:
+                message += f"\n\nCompact output: {size_report(clean_data, strict=self.strict_json_var.get())}"
+            messagebox.showinfo("Copied", message)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to copy: {e}")
+
+    def apply_window_settings(self):
+        loaded = False
+        if os.path.exists(self.window_config_file):
+            try:
+                config = load_json_file(self.window_config_file)
+                width = config.get("width", 1100)
+                height = config.get("height", 700)
+                x = config.get("x", 100)
+                y = config.get("y", 100)
+                self.geometry(f"{width}x{height}+{x}+{y}")
+                loaded = True
+            except Exception as e:
+                print(f"Failed to load window config: {e}")
+        
+        if not loaded:
+            # Default centering
+            width = 1100
+            height = 700
+            screen_width = self.winfo_screenwidth()
+            screen_height = self.winfo_screenheight()
+            x = (screen_width - width) // 2
+            y = (screen_height - height) // 2
+            self.geometry(f"{width}x{height}+{x}+{y}")
+
+    def generate_harmonious_colors(self, exclude=None):
+        # Stay as far as possible from the colors the other blocks already use
+        existing = [item.get("style", {}).get("navigationBackgroundColor") for item in self.config_data if item is not exclude]
+        return generate_distinct_colors(existing)
+
+    def on_closing(self):
+        try:
+            # Save window state
+            # self.geometry() returns string like "900x700+100+100"
+            geo = self.geometry()
+            parts = geo.split('+')
+            size = parts[0].split('x')
+            width = int(size[0])
+            height = int(size[1])
+            x = int(parts[1])
+            y = int(parts[2])
+            
+            config = {
+                "width": width,
+                "height": height,
+                "x": x,
+                "y": y
+            }
+            with open(self.window_config_file, 'w') as f:
+                json.dump(config, f)
+        except Exception as e:
+            print(f"Failed to save window config: {e}")
+
+        # Write out any picklist changes still waiting on the debounce timer
+        self.picklist_manager.flush()
+        self.load_cancel.set()
+        self.after_cancel(self.poll_after_id)
+        for after_id in (self.heartbeat_after_id, self.trace_overlay_after_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self.tracer.close()
+            
+        self.destroy()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AWS Peacock Configurator")
+    parser.add_argument("--trace", nargs="?", const="1", metavar="PATH",
+                        help="show timing overlay; with PATH also append a JSONL trace there (same as PEACOCK_TRACE)")
+    args = parser.parse_args(argv)
+    app = ConfiguratorApp(tracer_from_env(args.trace) if args.trace else None)
+    app.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Finds env entries that conflict across blocks.
+
+The extension applies the first block whose env matches, so a later block
+claiming the same (account, region) pair never takes effect. Everything here
+is a single pass over the blocks with dict lookups, so it stays linear for
+large generated configs.
+"""
+from peacock_config import get_envs
+
+def analyze_config(config, picklists=None):
+    """Returns a report dict with 0-based block indexes.
+
+    duplicates: {(account, region): [blocks claiming it, in order]} for pairs claimed more than once
+    shadowed: [blocks where every env pair is already claimed by an earlier block]
+    unknown_accounts: {account: [blocks]} for accounts not in the picklists
+    unknown_regions: {region: [blocks]} for regions not in the picklists
+    """
+    claims = {} # (account, region) -> [block indexes]
+    shadowed = []
+    unknown_accounts = {}
+    unknown_regions = {}
+    for idx, block in enumerate(config):
+        pairs = []
+        for env in get_envs(block):
+            account = env.get("account", "")
+            region = env.get("region", "")
+            pair = (account, region)
+            owners = claims.setdefault(pair, [])
+            # One block listing a pair twice is not a conflict with itself
+            if not owners or owners[-1] != idx:
+                owners.append(idx)
+            pairs.append(pair)
+            if picklists is not None:
+                if account and account not in picklists.accounts_by_id:
+                    record_once(unknown_accounts, account, idx)
+                if region and region not in picklists.region_set:
+                    record_once(unknown_regions, region, idx)
+        if pairs and all(claims[pair][0] != idx for pair in pairs):
+            shadowed.append(idx)
+
+    return {
+        "duplicates": {pair: owners for pair, owners in claims.items() if len(owners) > 1},
+        "shadowed": shadowed,
+        "unknown_accounts": unknown_accounts,
+        "unknown_regions": unknown_regions,
+    }
+
+def record_once(table, key, idx):
+    blocks = table.setdefault(key, [])
+    if not blocks or blocks[-1] != idx:
+        blocks.append(idx)
+
+def has_problems(report):
+    return any(report[key] for key in ("duplicates", "shadowed", "unknown_accounts", "unknown_regions"))
+
+def block_list(indexes):
+    return ", ".join(f"#{idx + 1}" for idx in indexes)
+
+def format_report(report, picklists=None):
+    """Human readable lines, block numbers are 1-based like the rest of the UI."""
+    lines = []
+    for (account, region), owners in report["duplicates"].items():
+        name = picklists.get_account_name(account) if picklists else ""
+        label = f"{name} ({account})" if name else (account or "<any account>")
+        lines.append(f"Duplicate {label} / {region or '<any region>'}: blocks {block_list(owners)}, block #{owners[0] + 1} wins")
+    for idx in report["shadowed"]:
+        lines.append(f"Block #{idx + 1} never applies, all of its envs are claimed by earlier blocks")
+    for account, blocks in report["unknown_accounts"].items():
+        lines.append(f"Account {account} is not in the picklists: blocks {block_list(blocks)}")
+    for region, blocks in report["unknown_regions"].items():
+        lines.append(f"Region {region} is not in the picklists: blocks {block_list(blocks)}")
+    return lines
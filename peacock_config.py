@@ -0,0 +1,848 @@
+"""GUI-free Peacock config model: loading, normalizing, theming and saving.
+
+Usable as a library by configurator.py or from the command line:
+
+    python -m peacock_config validate examples/*.json
+    python -m peacock_config add-block config.json --account 123456789012 --region us-east-1 --theme --in-place
+"""
+import argparse
+import bisect
+import colorsys
+import csv
+import hashlib
+import json
+import math
+import os
+import random
+import stat
+import sys
+import tempfile
+import threading
+
+# Most entries a type-ahead combo box shows at once
+TYPEAHEAD_LIMIT = 50
+
+STYLE_KEYS = ("navigationBackgroundColor", "accountMenuButtonBackgroundColor")
+DEFAULT_COLOR = "#ffffff"
+
+# Header spellings used by Organizations console/CLI exports, compared lower-cased without spaces
+ACCOUNT_ID_COLUMNS = ("id", "accountid")
+ACCOUNT_NAME_COLUMNS = ("name", "accountname")
+
+def iter_account_records(filepath):
+    """Yields (account_id, name) pairs from an Organizations list-accounts JSON or CSV export."""
+    with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
+        head = f.read(1024).lstrip()
+        f.seek(0)
+        if filepath.lower().endswith(".csv") or not head.startswith(("{", "[")):
+            reader = csv.reader(f)
+            header = [col.strip().lower().replace(" ", "") for col in next(reader, [])]
+            id_col = next((header.index(c) for c in ACCOUNT_ID_COLUMNS if c in header), None)
+            name_col = next((header.index(c) for c in ACCOUNT_NAME_COLUMNS if c in header), None)
+            if id_col is None:
+                raise ValueError("CSV has no account ID column")
+            for row in reader:
+                if len(row) > id_col:
+                    name = row[name_col].strip() if name_col is not None and len(row) > name_col else ""
+                    yield row[id_col].strip(), name
+            return
+
+        # picklists.json may be json5 from older versions of the app
+        data = loads_json(f.read())
+        # `aws organizations list-accounts` wraps records in "Accounts", picklists.json uses "accounts"
+        if isinstance(data, dict):
+            data = data.get("Accounts", data.get("accounts", []))
+        for record in data:
+            account_id = str(record.get("Id", record.get("id", ""))).strip()
+            yield account_id, str(record.get("Name", record.get("name", ""))).strip()
+
+def loads_json(text):
+    """Parses with the stdlib C parser, falling back to json5 for relaxed syntax (unquoted keys, trailing commas)."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        # json5 is pure Python and slow to import, only pay for it when needed
+        import json5
+        return json5.loads(text)
+
+def load_json_file(filepath):
+    with open(filepath, 'r') as f:
+        return loads_json(f.read())
+
+def dumps_json(data, strict=False):
+    # Strict output is still valid json5, and takes the fast path on the next load
+    if strict:
+        return json.dumps(data, indent=2)
+    import json5
+    return json5.dumps(data, indent=2)
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# Read once at import, os.umask() can only be queried by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+def write_file_atomic(filepath, text):
+    # Write to a temp file next to the target, then swap it in so readers never see a partial file
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(filepath))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        # mkstemp files are 0600; keep the target's mode, or what open() would have given a new file
+        try:
+            mode = stat.S_IMODE(os.stat(filepath).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class PicklistManager:
+    def __init__(self, filepath="picklists.json", save_delay=None):
+        self.filepath = filepath
+        # Seconds to coalesce changes before writing on a background thread, None writes immediately
+        self.save_delay = save_delay
+        self.save_timer = None
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.regions = []
+        self.accounts = []
+        # Indexes kept in sync with the lists above
+        self.region_set = set()
+        self.accounts_by_id = {}
+        self.account_names = [] # sorted names, parallel to self.accounts
+        # Display strings shared by every account combo box, rebuilt once per version
+        self.version = 0
+        self.account_display_list = None
+        self.display_to_id = {}
+        self.id_to_display = {}
+        # Type-ahead index: sorted (lowercased key, display) pairs for names and IDs
+        self.account_search_keys = None
+        self.load_picklists()
+
+    def load_picklists(self):
+        if os.path.exists(self.filepath):
+            try:
+                data = load_json_file(self.filepath)
+                self.regions = data.get("regions", [])
+                self.accounts = data.get("accounts", [])
+            except Exception as e:
+                print(f"Error loading picklists: {e}")
+                self.regions = []
+                self.accounts = []
+        else:
+            self.regions = []
+            self.accounts = []
+        self.rebuild_indexes()
+
+    def rebuild_indexes(self):
+        # Keep the first entry for duplicate IDs, like add_account would
+        self.accounts_by_id = {}
+        for acc in self.accounts:
+            self.accounts_by_id.setdefault(acc["id"], acc)
+        self.accounts = sorted(self.accounts_by_id.values(), key=lambda x: x["name"])
+        self.account_names = [acc["name"] for acc in self.accounts]
+        self.regions = sorted(set(self.regions))
+        self.region_set = set(self.regions)
+        self.invalidate_account_display()
+
+    def invalidate_account_display(self):
+        self.version += 1
+        self.account_display_list = None
+        self.account_search_keys = None
+
+    def save_picklists(self):
+        self.dirty = True
+        if self.save_delay is None:
+            self.flush()
+            return
+        # Debounce: restart the timer so a burst of changes ends in one write
+        if self.save_timer is not None:
+            self.save_timer.cancel()
+        self.save_timer = threading.Timer(self.save_delay, self.flush)
+        self.save_timer.daemon = True
+        self.save_timer.start()
+
+    def flush(self):
+        """Writes pending changes now. Safe to call from the Tk thread or the timer."""
+        if self.save_timer is not None:
+            self.save_timer.cancel()
+        with self.save_lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            # Copy the lists so the Tk thread can keep editing while we serialize
+            data = {
+                "regions": list(self.regions),
+                "accounts": list(self.accounts)
+            }
+            try:
+                # Strict JSON, so large picklists load on the fast path
+                write_file_atomic(self.filepath, dumps_json(data, strict=True))
+            except Exception as e:
+                print(f"Error saving picklists: {e}")
+
+    def add_region(self, region):
+        if region and region not in self.region_set:
+            bisect.insort(self.regions, region)
+            self.region_set.add(region)
+            self.save_picklists()
+            return True
+        return False
+
+    def remove_region(self, region):
+        if region in self.region_set:
+            del self.regions[bisect.bisect_left(self.regions, region)]
+            self.region_set.discard(region)
+            self.save_picklists()
+            return True
+        return False
+
+    def add_account(self, account_id, name):
+        if not account_id or account_id in self.accounts_by_id:
+            return False
+        acc = {"id": account_id, "name": name}
+        # Insert in name order instead of re-sorting
+        pos = bisect.bisect_right(self.account_names, name)
+        self.account_names.insert(pos, name)
+        self.accounts.insert(pos, acc)
+        self.accounts_by_id[account_id] = acc
+        self.invalidate_account_display()
+        self.save_picklists()
+        return True
+
+    def add_accounts(self, accounts):
+        """Adds (account_id, name) pairs, sorting and saving once. Returns the number added."""
+        added = 0
+        for account_id, name in accounts:
+            if account_id and account_id not in self.accounts_by_id:
+                acc = {"id": account_id, "name": name}
+                self.accounts_by_id[account_id] = acc
+                self.accounts.append(acc)
+                added += 1
+        if added:
+            self.accounts.sort(key=lambda x: x["name"])
+            self.account_names = [acc["name"] for acc in self.accounts]
+            self.invalidate_account_display()
+            self.save_picklists()
+        return added
+
+    def import_accounts(self, filepath):
+        """Merges an Organizations export into the account list. Returns (added, skipped)."""
+        total = 0
+        def counted(records):
+            nonlocal total
+            for record in records:
+                total += 1
+                yield record
+        added = self.add_accounts(counted(iter_account_records(filepath)))
+        return added, total - added
+
+    def remove_account(self, account_id):
+        acc = self.accounts_by_id.pop(account_id, None)
+        if acc is None:
+            return False
+        # Walk the run of equal names to find this exact entry
+        pos = bisect.bisect_left(self.account_names, acc["name"])
+        while self.accounts[pos] is not acc:
+            pos += 1
+        del self.accounts[pos]
+        del self.account_names[pos]
+        self.invalidate_account_display()
+        self.save_picklists()
+        return True
+
+    def get_account_display_list(self):
+        # Shared between callers, treat as read-only
+        if self.account_display_list is None:
+            self.account_display_list = [f"{acc['name']} ({acc['id']})" for acc in self.accounts]
+            ids = [acc["id"] for acc in self.accounts]
+            self.display_to_id = dict(zip(self.account_display_list, ids))
+            self.id_to_display = dict(zip(ids, self.account_display_list))
+        return self.account_display_list
+
+    def get_account_display(self, account_id):
+        # Display string for an ID, or the bare ID if it is not in the picklist
+        self.get_account_display_list()
+        return self.id_to_display.get(account_id, account_id)
+        
+    def get_account_id_from_display(self, display_str):
+        if not display_str: return ""
+        self.get_account_display_list()
+        acc_id = self.display_to_id.get(display_str)
+        if acc_id is not None:
+            return acc_id
+        if "(" in display_str and display_str.endswith(")"):
+            return display_str.split("(")[-1].strip(")")
+        return display_str
+
+    def get_account_name(self, account_id):
+        if not account_id: return ""
+        acc = self.accounts_by_id.get(account_id)
+        return acc["name"] if acc else ""
+
+    def search_accounts(self, query, limit=TYPEAHEAD_LIMIT):
+        """Display strings matching the query: name/ID prefix matches first, then substring matches."""
+        displays = self.get_account_display_list()
+        if self.account_search_keys is None:
+            keys = [(display.lower(), display) for display in displays]
+            keys.extend((acc["id"], self.id_to_display[acc["id"]]) for acc in self.accounts)
+            keys.sort()
+            self.account_search_keys = keys
+        return typeahead_matches(self.account_search_keys, displays, query, limit)
+
+    def search_regions(self, query, limit=TYPEAHEAD_LIMIT):
+        # Region lists are short and already sorted
+        return typeahead_matches([(region.lower(), region) for region in self.regions], self.regions, query, limit)
+
+def typeahead_matches(sorted_keys, values, query, limit):
+    query = query.strip().lower()
+    if not query:
+        return values[:limit]
+    matches = []
+    seen = set()
+    # Prefix matches are a contiguous run in the sorted keys
+    pos = bisect.bisect_left(sorted_keys, (query,))
+    while pos < len(sorted_keys) and len(matches) < limit and sorted_keys[pos][0].startswith(query):
+        value = sorted_keys[pos][1]
+        if value not in seen:
+            seen.add(value)
+            matches.append(value)
+        pos += 1
+    # Fill up with substring matches, stopping as soon as we have enough
+    for value in values:
+        if len(matches) >= limit:
+            break
+        if value not in seen and query in value.lower():
+            seen.add(value)
+            matches.append(value)
+    return matches
+
+def generate_harmonious_colors():
+    # Generate random hue
+    h = random.random()
+    # Saturation 0.5-0.9, Lightness 0.4-0.6 for nice UI colors
+    s = 0.5 + random.random() * 0.4
+    l = 0.4 + random.random() * 0.2
+    
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    primary = '#%02x%02x%02x' % (int(r*255), int(g*255), int(b*255))
+    
+    # Secondary: Complementary or Split Comp
+    # Just simple shift for now
+    h2 = (h + 0.5) % 1.0
+    r2, g2, b2 = colorsys.hls_to_rgb(h2, l, s)
+    secondary = '#%02x%02x%02x' % (int(r2*255), int(g2*255), int(b2*255))
+    
+    return primary, secondary
+
+# --- Palette engine ---------------------------------------------------------
+# Colors are placed in CIELAB (via LCh) so distances roughly match what people
+# perceive, then checked against the nav text color with the WCAG contrast ratio.
+
+NAV_TEXT_COLOR = "#ffffff" # AWS console nav text
+MIN_TEXT_CONTRAST = 4.5 # WCAG AA for normal text
+PALETTE_LIGHTNESS = (22.0, 52.0) # L* band to spread over, before contrast clamping
+PALETTE_CHROMA = (30.0, 60.0)
+GOLDEN_ANGLE = 137.50776405003785
+# Plastic-number steps give a low-discrepancy walk over lightness and chroma
+PLASTIC_STEP_1 = 0.7548776662466927
+PLASTIC_STEP_2 = 0.5698402909980532
+
+def hex_to_rgb(color):
+    return tuple(int(color[i:i + 2], 16) / 255.0 for i in (1, 3, 5))
+
+def rgb_to_hex(rgb):
+    return '#%02x%02x%02x' % tuple(int(round(max(0.0, min(1.0, c)) * 255)) for c in rgb)
+
+def srgb_to_linear(c):
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+def linear_to_srgb(c):
+    return c * 12.92 if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+
+def relative_luminance(rgb):
+    r, g, b = (srgb_to_linear(c) for c in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+def contrast_ratio(rgb1, rgb2):
+    l1, l2 = relative_luminance(rgb1), relative_luminance(rgb2)
+    if l1 < l2:
+        l1, l2 = l2, l1
+    return (l1 + 0.05) / (l2 + 0.05)
+
+def lab_f(t):
+    return t ** (1 / 3) if t > 0.008856 else 7.787 * t + 16 / 116
+
+def lab_f_inv(t):
+    return t ** 3 if t > 0.206893 else (t - 16 / 116) / 7.787
+
+def rgb_to_lab(rgb):
+    r, g, b = (srgb_to_linear(c) for c in rgb)
+    # D65 reference white
+    x = (0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047
+    y = 0.2126 * r + 0.7152 * g + 0.0722 * b
+    z = (0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883
+    fx, fy, fz = lab_f(x), lab_f(y), lab_f(z)
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+def lab_to_rgb(lab):
+    """Returns linear-clipped sRGB and whether the color was inside the gamut."""
+    l, a, b = lab
+    fy = (l + 16) / 116
+    x = lab_f_inv(fy + a / 500) * 0.95047
+    y = lab_f_inv(fy)
+    z = lab_f_inv(fy - b / 200) * 1.08883
+    linear = (
+        3.2406 * x - 1.5372 * y - 0.4986 * z,
+        -0.9689 * x + 1.8758 * y + 0.0415 * z,
+        0.0557 * x - 0.2040 * y + 1.0570 * z,
+    )
+    in_gamut = all(-0.001 <= c <= 1.001 for c in linear)
+    return tuple(linear_to_srgb(max(0.0, min(1.0, c))) for c in linear), in_gamut
+
+def lch_to_rgb(l, c, h):
+    # Pull chroma in until the color fits sRGB, keeping hue and lightness
+    rad = math.radians(h)
+    while True:
+        rgb, in_gamut = lab_to_rgb((l, c * math.cos(rad), c * math.sin(rad)))
+        if in_gamut or c < 1:
+            return rgb
+        c *= 0.85
+
+def delta_e(rgb1, rgb2):
+    # CIE76 distance, good enough to rank how far apart two swatches look
+    return math.dist(rgb_to_lab(rgb1), rgb_to_lab(rgb2))
+
+def away_from_text(text_rgb):
+    # Lightness direction that raises contrast: darker under light text, lighter under dark
+    return -1.0 if relative_luminance(text_rgb) > 0.18 else 1.0
+
+def ensure_contrast(l, c, h, text_rgb, min_contrast):
+    # Move lightness away from the text color until the rounded hex, as written out, is readable
+    step = 2.0 * away_from_text(text_rgb)
+    color = rgb_to_hex(lch_to_rgb(l, c, h))
+    while contrast_ratio(hex_to_rgb(color), text_rgb) < min_contrast and 0 < l < 100:
+        l += step
+        color = rgb_to_hex(lch_to_rgb(l, c, h))
+    return color, l
+
+def palette_entry(l, c, h, text_rgb, min_contrast):
+    primary, l = ensure_contrast(l, c, h, text_rgb, min_contrast)
+    # Secondary keeps the hue with a lighter tone (darker at the top of the band)
+    l2 = l + 12 if l + 12 <= PALETTE_LIGHTNESS[1] else l - 12
+    secondary, clamped = ensure_contrast(l2, c, h, text_rgb, min_contrast)
+    if clamped != l2:
+        # That tone isn't readable and clamping would land on the primary, go the other way
+        secondary, _ = ensure_contrast(l + 12 * away_from_text(text_rgb), c, h, text_rgb, min_contrast)
+    return primary, secondary
+
+def generate_palette(count, text_color=NAV_TEXT_COLOR, min_contrast=MIN_TEXT_CONTRAST, offset=None):
+    """Returns `count` (primary, secondary) pairs spread evenly over hue, lightness and chroma.
+
+    Hue advances by the golden angle and lightness/chroma follow a low-discrepancy
+    sequence, so every prefix of the palette is well spread and neighbours differ
+    the most. Work is O(count).
+    """
+    if offset is None:
+        offset = random.random()
+    text_rgb = hex_to_rgb(text_color)
+    l_lo, l_hi = PALETTE_LIGHTNESS
+    c_lo, c_hi = PALETTE_CHROMA
+    palette = []
+    for i in range(count):
+        h = (offset * 360.0 + i * GOLDEN_ANGLE) % 360.0
+        l = l_lo + (l_hi - l_lo) * ((offset + i * PLASTIC_STEP_1) % 1.0)
+        c = c_lo + (c_hi - c_lo) * ((offset + i * PLASTIC_STEP_2) % 1.0)
+        palette.append(palette_entry(l, c, h, text_rgb, min_contrast))
+    return palette
+
+def generate_distinct_colors(existing, text_color=NAV_TEXT_COLOR, min_contrast=MIN_TEXT_CONTRAST, candidates=32):
+    """Picks a (primary, secondary) pair whose primary is farthest from the `existing` colors."""
+    existing_lab = [rgb_to_lab(hex_to_rgb(color)) for color in existing if is_hex_color(color)]
+    best, best_distance = None, -1.0
+    for primary, secondary in generate_palette(candidates, text_color, min_contrast):
+        lab = rgb_to_lab(hex_to_rgb(primary))
+        distance = min((math.dist(lab, other) for other in existing_lab), default=0.0)
+        if distance > best_distance:
+            best, best_distance = (primary, secondary), distance
+    return best
+
+def assign_palette(config, indexes=None, text_color=NAV_TEXT_COLOR, min_contrast=MIN_TEXT_CONTRAST):
+    """Gives the selected blocks (all by default) mutually distinct themes in one pass."""
+    blocks = config if indexes is None else [config[i] for i in indexes]
+    for block, (primary, secondary) in zip(blocks, generate_palette(len(blocks), text_color, min_contrast)):
+        set_theme(block, primary, secondary)
+    return config
+
+def seeded_colors(block, text_color=NAV_TEXT_COLOR, min_contrast=MIN_TEXT_CONTRAST):
+    """Derives a (primary, secondary) pair from the block's account/region pairs.
+
+    The same envs always give the same colors, so configs regenerated in CI stay
+    stable without storing any state.
+    """
+    key = "|".join(sorted(f"{env.get('account', '')}/{env.get('region', '')}" for env in get_envs(block)))
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    h, lf, cf = (int.from_bytes(digest[i:i + 4], "big") / 2 ** 32 for i in (0, 4, 8))
+    l_lo, l_hi = PALETTE_LIGHTNESS
+    c_lo, c_hi = PALETTE_CHROMA
+    return palette_entry(l_lo + (l_hi - l_lo) * lf, c_lo + (c_hi - c_lo) * cf, h * 360.0, hex_to_rgb(text_color), min_contrast)
+
+def assign_seeded_themes(config, indexes=None, text_color=NAV_TEXT_COLOR, min_contrast=MIN_TEXT_CONTRAST):
+    """Themes the selected blocks (all by default) with colors seeded from their envs."""
+    blocks = config if indexes is None else [config[i] for i in indexes]
+    for block in blocks:
+        primary, secondary = seeded_colors(block, text_color, min_contrast)
+        set_theme(block, primary, secondary)
+    return config
+
+def get_envs(block):
+    # The extension accepts a single env dict or a list of them
+    envs = block.get("env", [])
+    if isinstance(envs, dict):
+        return [envs]
+    return envs
+
+def new_block(account="", region=""):
+    return {
+        "env": {
+            "account": account,
+            "region": region
+        },
+        "style": {key: DEFAULT_COLOR for key in STYLE_KEYS}
+    }
+
+def add_block(config, account="", region="", theme=False):
+    block = new_block(account, region)
+    if theme:
+        theme_block(block)
+    config.append(block)
+    return block
+
+def set_theme(block, primary, secondary):
+    # Replace the style dict instead of mutating it, history snapshots may share the old one
+    style = dict(block.get("style", {}))
+    style["navigationBackgroundColor"] = primary
+    style["accountMenuButtonBackgroundColor"] = secondary
+    block["style"] = style
+
+def theme_block(block):
+    primary, secondary = generate_harmonious_colors()
+    set_theme(block, primary, secondary)
+
+def normalize_config(config, env_form="auto"):
+    """Rewrites env entries in place: "list" always, "dict" when single, "auto" dict for one env else list."""
+    for block in config:
+        envs = [env for env in get_envs(block) if env.get("account") or env.get("region")]
+        if env_form == "list" or len(envs) != 1:
+            block["env"] = envs
+        else:
+            block["env"] = envs[0]
+    return config
+
+def clean_block(block):
+    # Underscore keys hold UI state and never go to disk
+    return {k: v for k, v in block.items() if not k.startswith("_")}
+
+def clean_config(config):
+    return [clean_block(block) for block in config]
+
+def validate_config(config):
+    """Returns a list of human readable problems, empty when the config is usable by the extension."""
+    if not isinstance(config, list):
+        return ["top level must be a list of blocks"]
+    errors = []
+    for idx, block in enumerate(config):
+        where = f"block #{idx + 1}"
+        if not isinstance(block, dict):
+            errors.append(f"{where}: must be an object")
+            continue
+        envs = block.get("env")
+        if not isinstance(envs, (dict, list)):
+            errors.append(f"{where}: env must be an object or a list")
+        else:
+            for env in get_envs(block):
+                if not isinstance(env, dict):
+                    errors.append(f"{where}: env entries must be objects")
+                elif not all(isinstance(env.get(k, ""), str) for k in ("account", "region")):
+                    errors.append(f"{where}: account and region must be strings")
+        style = block.get("style")
+        if not isinstance(style, dict):
+            errors.append(f"{where}: style must be an object")
+            continue
+        for key, value in style.items():
+            if not is_hex_color(value):
+                errors.append(f"{where}: style.{key} is not a #rrggbb color: {value!r}")
+    return errors
+
+def is_hex_color(value):
+    if not isinstance(value, str) or len(value) != 7 or value[0] != "#":
+        return False
+    try:
+        int(value[1:], 16)
+    except ValueError:
+        return False
+    return True
+
+def compact_config(config):
+    """Canonical, smaller equivalent of a config.
+
+    Envs already claimed by an earlier block (the extension applies the first
+    match) and repeated envs are dropped, blocks left without envs go away, and
+    blocks with identical styles are merged into the first one with a list-form
+    env. Envs with a blank account or region might act as wildcards, so blocks
+    holding them, or envs such a blank could match, stay where they are.
+    """
+    claimed = set()
+    any_account_regions = set() # regions claimed for every account (blank account)
+    any_region_accounts = set() # accounts claimed in every region (blank region)
+    match_all = False
+    groups = {} # style key -> merged output block
+    result = []
+    for block in config:
+        clean = clean_block(block)
+        envs = get_envs(clean)
+        if not envs:
+            result.append(clean)
+            continue
+
+        kept = []
+        movable = True
+        for env in envs:
+            account = env.get("account", "")
+            region = env.get("region", "")
+            if (account, region) in claimed:
+                continue
+            claimed.add((account, region))
+            kept.append({"account": account, "region": region})
+            if not account or not region or match_all or region in any_account_regions or account in any_region_accounts:
+                movable = False
+        for env in kept:
+            if not env["account"] and not env["region"]:
+                match_all = True
+            elif not env["account"]:
+                any_account_regions.add(env["region"])
+            elif not env["region"]:
+                any_region_accounts.add(env["account"])
+        if not kept:
+            continue
+
+        rest = {k: v for k, v in clean.items() if k != "env"}
+        key = json.dumps(rest, sort_keys=True)
+        target = groups.get(key) if movable else None
+        if target is None:
+            merged = {"env": kept}
+            merged.update(rest)
+            result.append(merged)
+            if movable:
+                groups[key] = merged
+        else:
+            target["env"].extend(kept)
+
+    for block in result:
+        envs = block.get("env")
+        if isinstance(envs, list) and len(envs) == 1:
+            block["env"] = envs[0]
+    return result
+
+def serialize_config(config, strict=False, compact=False):
+    """Text written by Save/Copy; compact output is merged and minified strict JSON."""
+    if compact:
+        return json.dumps(compact_config(config), separators=(",", ":"))
+    return dumps_json(clean_config(config), strict=strict)
+
+def size_report(config, strict=False):
+    before = len(serialize_config(config, strict=strict).encode("utf-8"))
+    after = len(serialize_config(config, compact=True).encode("utf-8"))
+    return f"{before:,} -> {after:,} bytes ({before / max(after, 1):.1f}x smaller)"
+
+def load_config_file(filepath):
+    return load_json_file(filepath)
+
+def save_config_file(filepath, config, strict=False, compact=False):
+    write_file_atomic(filepath, serialize_config(config, strict=strict, compact=compact))
+
+# --- Command line -----------------------------------------------------------
+
+def emit(args, filepath, config):
+    if args.compact and args.report:
+        print(f"{filepath or 'merged'}: {size_report(config, strict=args.strict)}", file=sys.stderr)
+    if args.output:
+        save_config_file(args.output, config, strict=args.strict, compact=args.compact)
+    elif args.in_place:
+        save_config_file(filepath, config, strict=args.strict, compact=args.compact)
+    else:
+        sys.stdout.write(serialize_config(config, strict=args.strict, compact=args.compact) + "\n")
+
+def for_each_file(args, transform):
+    if len(args.files) > 1 and not args.in_place:
+        raise SystemExit("multiple files need --in-place")
+    for filepath in args.files:
+        config = load_config_file(filepath)
+        transform(config)
+        emit(args, filepath, config)
+    return 0
+
+def cmd_validate(args):
+    status = 0
+    for filepath in args.files:
+        try:
+            errors = validate_config(load_config_file(filepath))
+        except Exception as e:
+            errors = [f"failed to parse: {e}"]
+        for error in errors:
+            print(f"{filepath}: {error}")
+        if errors:
+            status = 1
+        elif not args.quiet:
+            print(f"{filepath}: ok")
+    return status
+
+def cmd_analyze(args):
+    from peacock_analyze import analyze_config, format_report, has_problems
+    picklists = PicklistManager(args.picklists) if args.picklists else None
+    status = 0
+    for filepath in args.files:
+        report = analyze_config(load_config_file(filepath), picklists)
+        for line in format_report(report, picklists):
+            print(f"{filepath}: {line}")
+        if has_problems(report):
+            status = 1
+        elif not args.quiet:
+            print(f"{filepath}: no conflicts")
+    return status
+
+def cmd_normalize(args):
+    return for_each_file(args, lambda config: normalize_config(config, args.env))
+
+def cmd_add_block(args):
+    return for_each_file(args, lambda config: add_block(config, args.account, args.region, theme=args.theme))
+
+def cmd_theme(args):
+    def transform(config):
+        indexes = args.index or range(1, len(config) + 1)
+        # 1-based, so 0 would silently wrap around to the last block
+        for idx in indexes:
+            if not 1 <= idx <= len(config):
+                raise SystemExit(f"--index {idx} is out of range, the config has {len(config)} blocks")
+        if args.palette:
+            assign_palette(config, [idx - 1 for idx in indexes], text_color=args.text_color)
+            return
+        if args.seeded:
+            assign_seeded_themes(config, [idx - 1 for idx in indexes], text_color=args.text_color)
+            return
+        for idx in indexes:
+            theme_block(config[idx - 1])
+    return for_each_file(args, transform)
+
+def cmd_emit(args):
+    return for_each_file(args, lambda config: None)
+
+def cmd_merge(args):
+    merged = []
+    for filepath in args.files:
+        merged.extend(load_config_file(filepath))
+    args.in_place = False
+    emit(args, None, merged)
+    return 0
+
+def cmd_diff(args):
+    from peacock_merge import diff_configs, format_diff
+    changes = diff_configs(load_config_file(args.old), load_config_file(args.new))
+    for line in format_diff(changes):
+        print(line)
+    return 1 if changes else 0
+
+def cmd_merge3(args):
+    from peacock_merge import merge_configs, format_conflicts
+    merged, conflicts = merge_configs(load_config_file(args.base), load_config_file(args.ours), load_config_file(args.theirs))
+    for line in format_conflicts(conflicts):
+        print(f"conflict: {line}", file=sys.stderr)
+    args.in_place = False
+    emit(args, None, merged)
+    return 1 if conflicts else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="peacock_config", description="Validate, transform and emit AWS Peacock configs without the GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def output_options(p, in_place=True):
+        p.add_argument("-o", "--output", help="write to this file instead of stdout")
+        if in_place:
+            p.add_argument("-i", "--in-place", action="store_true", help="rewrite the input files")
+        p.add_argument("--strict", action="store_true", help="emit strict JSON instead of json5")
+        p.add_argument("--compact", action="store_true", help="merge blocks with identical styles, drop dead envs and minify")
+        p.add_argument("--report", action="store_true", help="with --compact, print before/after sizes to stderr")
+
+    p = sub.add_parser("validate", help="check configs can be parsed and have the expected shape")
+    p.add_argument("files", nargs="+")
+    p.add_argument("-q", "--quiet", action="store_true", help="only print problems")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("analyze", help="report duplicate/shadowed envs and accounts or regions missing from the picklists")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--picklists", help="picklists.json to check accounts and regions against")
+    p.add_argument("-q", "--quiet", action="store_true", help="only print problems")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("normalize", help="drop blank envs and rewrite env as dict or list")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--env", choices=("auto", "list", "dict"), default="auto")
+    output_options(p)
+    p.set_defaults(func=cmd_normalize)
+
+    p = sub.add_parser("add-block", help="append a block for an account/region")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--account", default="")
+    p.add_argument("--region", default="")
+    p.add_argument("--theme", action="store_true", help="generate colors for the new block")
+    output_options(p)
+    p.set_defaults(func=cmd_add_block)
+
+    p = sub.add_parser("theme", help="generate colors for blocks")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--index", type=int, action="append", help="1-based block number, repeatable (default: all)")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--palette", action="store_true", help="give the blocks mutually distinct colors instead of independent random ones")
+    mode.add_argument("--seeded", action="store_true", help="derive colors from each block's account/region so reruns are stable")
+    p.add_argument("--text-color", default=NAV_TEXT_COLOR, help="nav text color the palette must contrast with (default: %(default)s)")
+    output_options(p)
+    p.set_defaults(func=cmd_theme)
+
+    p = sub.add_parser("emit", help="re-serialize configs, stripping UI-only keys")
+    p.add_argument("files", nargs="+")
+    output_options(p)
+    p.set_defaults(func=cmd_emit)
+
+    p = sub.add_parser("merge", help="concatenate the blocks of several configs")
+    p.add_argument("files", nargs="+")
+    output_options(p, in_place=False)
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("diff", help="list blocks added, removed or changed, matched by account/region rather than position")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("merge3", help="three-way merge two edited copies of a config against their common base")
+    p.add_argument("base")
+    p.add_argument("ours")
+    p.add_argument("theirs")
+    output_options(p, in_place=False)
+    p.set_defaults(func=cmd_merge3)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
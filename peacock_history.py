@@ -0,0 +1,78 @@
+"""Undo/redo history of config snapshots with structural sharing.
+
+A snapshot is a tuple of fixed-size chunks of frozen blocks. Blocks are
+frozen as shallow dicts (UI state is kept outside the blocks), and a block
+whose values are the same objects as last time keeps its previous frozen
+dict, so unchanged blocks (and whole unchanged chunks) are shared between
+snapshots instead of being deep-copied. This relies on the model being copy-on-write: env and style
+values are replaced when they change, never mutated in place.
+"""
+from collections import deque
+
+CHUNK_SIZE = 64
+HISTORY_LIMIT = 1000
+
+MISSING = object()
+
+def freeze_block(block, previous=None):
+    """Returns `previous` when the block still holds the same value objects, else a new frozen view."""
+    if previous is not None and len(block) == len(previous) and all(previous.get(k, MISSING) is v for k, v in block.items()):
+        return previous
+    return dict(block)
+
+def make_snapshot(frozen_blocks, previous=()):
+    chunks = []
+    for n, start in enumerate(range(0, len(frozen_blocks), CHUNK_SIZE)):
+        chunk = tuple(frozen_blocks[start:start + CHUNK_SIZE])
+        # Reuse the previous chunk object when every block in it is shared
+        if n < len(previous) and len(previous[n]) == len(chunk) and all(a is b for a, b in zip(previous[n], chunk)):
+            chunk = previous[n]
+        chunks.append(chunk)
+    return tuple(chunks)
+
+def same_snapshot(a, b):
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+def snapshot_blocks(snapshot):
+    return [block for chunk in snapshot for block in chunk]
+
+class ConfigHistory:
+    def __init__(self, limit=HISTORY_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        self.current = ()
+
+    def reset(self, frozen_blocks):
+        self.undo_stack.clear()
+        self.redo_stack = []
+        self.current = make_snapshot(frozen_blocks)
+
+    def commit(self, frozen_blocks):
+        """Records a new step; returns False when nothing changed since the last one."""
+        snapshot = make_snapshot(frozen_blocks, self.current)
+        if same_snapshot(snapshot, self.current):
+            return False
+        self.undo_stack.append(self.current)
+        self.redo_stack = []
+        self.current = snapshot
+        return True
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self):
+        if not self.undo_stack:
+            return None
+        self.redo_stack.append(self.current)
+        self.current = self.undo_stack.pop()
+        return snapshot_blocks(self.current)
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        self.undo_stack.append(self.current)
+        self.current = self.redo_stack.pop()
+        return snapshot_blocks(self.current)
@@ -0,0 +1,115 @@
+"""Inverted index over config blocks for the search/filter bar.
+
+Each block is tokenized into account IDs, account names (from the
+picklists), regions and colors. Tokens are kept in a sorted list so a query
+term matches every token it is a prefix of with a bisect, and updating a
+block only touches that block's postings.
+"""
+import bisect
+import re
+
+from peacock_config import get_envs
+
+TOKEN_SPLIT = re.compile(r"[^0-9a-z#]+")
+
+class BlockIndex:
+    def __init__(self, picklists=None):
+        self.picklists = picklists
+        self.picklist_version = picklists.version if picklists else None
+        self.blocks = {} # id(block) -> block
+        self.block_tokens = {} # id(block) -> frozenset of tokens
+        self.postings = {} # token -> set of block ids
+        self.tokens = [] # sorted keys of postings, for prefix lookups
+
+    def tokenize(self, block):
+        words = []
+        for env in get_envs(block):
+            account = env.get("account", "")
+            region = env.get("region", "")
+            words.append(account)
+            words.append(region)
+            if self.picklists and account:
+                words.append(self.picklists.get_account_name(account))
+        for color in block.get("style", {}).values():
+            if isinstance(color, str):
+                words.append(color)
+                words.append(color.lstrip("#"))
+
+        tokens = set()
+        for word in words:
+            word = str(word).strip().lower()
+            if not word:
+                continue
+            # Whole value plus its parts, so "west" finds "us-west-2" and "prod" finds "FG3 Prod"
+            tokens.add(word)
+            tokens.update(part for part in TOKEN_SPLIT.split(word) if part)
+        return frozenset(tokens)
+
+    def rebuild(self, config):
+        self.blocks = {}
+        self.block_tokens = {}
+        self.postings = {}
+        self.tokens = []
+        if self.picklists:
+            self.picklist_version = self.picklists.version
+        for block in config:
+            self.blocks[id(block)] = block
+            tokens = self.tokenize(block)
+            self.block_tokens[id(block)] = tokens
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(id(block))
+        self.tokens = sorted(self.postings)
+
+    def update(self, block):
+        """Re-indexes one block (adding it if new); cost is proportional to its own tokens."""
+        key = id(block)
+        old = self.block_tokens.get(key, frozenset())
+        new = self.tokenize(block)
+        self.blocks[key] = block
+        self.block_tokens[key] = new
+        for token in old - new:
+            self.discard_posting(token, key)
+        for token in new - old:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                bisect.insort(self.tokens, token)
+            ids.add(key)
+
+    add = update
+
+    def remove(self, block):
+        key = id(block)
+        for token in self.block_tokens.pop(key, ()):
+            self.discard_posting(token, key)
+        self.blocks.pop(key, None)
+
+    def discard_posting(self, token, key):
+        ids = self.postings.get(token)
+        if ids is None:
+            return
+        ids.discard(key)
+        if not ids:
+            del self.postings[token]
+            del self.tokens[bisect.bisect_left(self.tokens, token)]
+
+    def match_term(self, term):
+        ids = set()
+        pos = bisect.bisect_left(self.tokens, term)
+        while pos < len(self.tokens) and self.tokens[pos].startswith(term):
+            ids.update(self.postings[self.tokens[pos]])
+            pos += 1
+        return ids
+
+    def search(self, query):
+        """Returns ids of blocks matching every whitespace-separated term of the query (prefix match)."""
+        # Account names come from the picklists, re-index if they changed
+        if self.picklists and self.picklists.version != self.picklist_version:
+            self.rebuild(list(self.blocks.values()))
+        result = None
+        for term in query.lower().split():
+            ids = self.match_term(term)
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return set(self.blocks) if result is None else result
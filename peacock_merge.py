@@ -0,0 +1,214 @@
+"""Keyed diff and three-way merge of configs.
+
+Blocks are matched by the (account, region) pairs in their env, not by list
+position, so reordering or inserting blocks doesn't look like every block
+changed. Matching is done with dict lookups, keeping diff and merge linear
+in the number of blocks.
+
+Merged blocks that are unchanged from `ours` are returned as the very same
+objects, so callers can tell cheaply which blocks actually changed.
+"""
+from peacock_config import get_envs
+
+MISSING = object()
+
+def env_pairs(block):
+    return [(env.get("account", ""), env.get("region", "")) for env in get_envs(block)]
+
+def block_key(block):
+    return tuple(sorted(set(env_pairs(block))))
+
+def describe_key(key):
+    if not key:
+        return "<no env>"
+    return ", ".join(f"{account or '<any account>'}/{region or '<any region>'}" for account, region in key)
+
+def match_blocks(base, other):
+    """{base index: other index} for blocks that are the same block in both configs.
+
+    Blocks with the same set of env pairs match first, in order. A block left
+    over then matches a leftover block it shares any env pair with, which
+    covers envs being added to or removed from a block.
+    """
+    by_key = {}
+    for idx, block in enumerate(base):
+        by_key.setdefault(block_key(block), []).append(idx)
+    # Reversed so pop() hands out the earliest block first
+    for owners in by_key.values():
+        owners.reverse()
+
+    matches = {}
+    leftovers = []
+    for idx, block in enumerate(other):
+        owners = by_key.get(block_key(block))
+        if owners:
+            matches[owners.pop()] = idx
+        else:
+            leftovers.append(idx)
+
+    by_pair = {}
+    for owners in by_key.values():
+        for base_idx in reversed(owners):
+            for pair in env_pairs(base[base_idx]):
+                by_pair.setdefault(pair, []).append(base_idx)
+    for owners in by_pair.values():
+        owners.reverse()
+    for idx in leftovers:
+        for pair in env_pairs(other[idx]):
+            owners = by_pair.get(pair)
+            # Matched blocks are dropped as they surface, so each is skipped once
+            while owners and owners[-1] in matches:
+                owners.pop()
+            if owners:
+                matches[owners.pop()] = idx
+                break
+    return matches
+
+def diff_configs(old, new):
+    """Changes from old to new as dicts with op "added", "removed" or "changed" and 0-based indexes."""
+    matches = match_blocks(old, new)
+    matched_new = set(matches.values())
+    changes = []
+    for idx, block in enumerate(old):
+        new_idx = matches.get(idx)
+        if new_idx is None:
+            changes.append({"op": "removed", "key": block_key(block), "old": idx})
+        elif new[new_idx] != block:
+            changes.append({"op": "changed", "key": block_key(new[new_idx]), "old": idx, "new": new_idx,
+                            "fields": changed_fields(block, new[new_idx])})
+    for idx, block in enumerate(new):
+        if idx not in matched_new:
+            changes.append({"op": "added", "key": block_key(block), "new": idx})
+    return changes
+
+def changed_fields(old, new, prefix=""):
+    fields = []
+    for field in list(old) + [k for k in new if k not in old]:
+        a, b = old.get(field, MISSING), new.get(field, MISSING)
+        if a == b:
+            continue
+        if isinstance(a, dict) and isinstance(b, dict) and field != "env":
+            fields.extend(changed_fields(a, b, f"{prefix}{field}."))
+        else:
+            fields.append(prefix + field)
+    return fields
+
+def format_diff(changes):
+    lines = []
+    for change in changes:
+        label = describe_key(change["key"])
+        if change["op"] == "added":
+            lines.append(f"+ block #{change['new'] + 1} {label}")
+        elif change["op"] == "removed":
+            lines.append(f"- block #{change['old'] + 1} {label}")
+        else:
+            lines.append(f"~ block #{change['old'] + 1} -> #{change['new'] + 1} {label}: {', '.join(change['fields'])}")
+    return lines
+
+def merge_values(base, ours, theirs, path, key, conflicts):
+    """Three-way merge of one value; conflicts keep ours and are recorded."""
+    if ours == theirs or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    # Both sides edited a sub-dict like style, merge it key by key
+    if path != "env" and all(isinstance(v, dict) or v is MISSING for v in (base, ours, theirs)) and ours is not MISSING and theirs is not MISSING:
+        base = {} if base is MISSING else base
+        merged = {}
+        for field in list(ours) + [k for k in theirs if k not in ours] + [k for k in base if k not in ours and k not in theirs]:
+            value = merge_values(base.get(field, MISSING), ours.get(field, MISSING), theirs.get(field, MISSING),
+                                 f"{path}.{field}" if path else field, key, conflicts)
+            if value is not MISSING:
+                merged[field] = value
+        return merged
+    conflicts.append({"key": key, "field": path, "base": base, "ours": ours, "theirs": theirs})
+    return ours
+
+def merge_block(base, ours, theirs, conflicts):
+    if ours == theirs or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    return merge_values(base, ours, theirs, "", block_key(ours), conflicts)
+
+def merge_configs(base, ours, theirs):
+    """Three-way merge; returns (merged config, conflicts).
+
+    Order follows ours, with blocks only theirs has placed after the block
+    they follow in theirs. On a conflict ours wins and the conflict is
+    reported, a block deleted on one side but edited on the other is kept.
+    """
+    conflicts = []
+    ours_of_base = match_blocks(base, ours)
+    theirs_of_base = match_blocks(base, theirs)
+    ours_matched = {o: b for b, o in ours_of_base.items()}
+    theirs_matched = {t: b for b, t in theirs_of_base.items()}
+
+    # Result for each ours block, None where theirs deleted it
+    result = {}
+    for idx, block in enumerate(ours):
+        base_idx = ours_matched.get(idx)
+        if base_idx is None:
+            result[idx] = block
+            continue
+        theirs_idx = theirs_of_base.get(base_idx)
+        if theirs_idx is None:
+            if block == base[base_idx]:
+                result[idx] = None
+            else:
+                conflicts.append({"key": block_key(block), "field": "deleted by them", "base": base[base_idx], "ours": block, "theirs": MISSING})
+                result[idx] = block
+            continue
+        result[idx] = merge_block(base[base_idx], block, theirs[theirs_idx], conflicts)
+
+    # Blocks ours added, by key, to spot both sides adding the same block.
+    # Reversed lists so pop() pairs them up in order, like match_blocks
+    ours_added = {}
+    for idx in reversed(range(len(ours))):
+        if idx not in ours_matched:
+            ours_added.setdefault(block_key(ours[idx]), []).append(idx)
+
+    # Theirs-only blocks go after the ours block preceding them in theirs
+    inserts = {} # ours index (-1 for the start) -> [blocks]
+    anchor = -1
+    for idx, block in enumerate(theirs):
+        base_idx = theirs_matched.get(idx)
+        if base_idx is None:
+            owners = ours_added.get(block_key(block))
+            if owners:
+                same = owners.pop()
+                # Both sides added it, merge as if from an empty block
+                result[same] = merge_values(MISSING, ours[same], block, "", block_key(block), conflicts)
+                anchor = same
+                continue
+        else:
+            ours_idx = ours_of_base.get(base_idx)
+            if ours_idx is not None:
+                anchor = ours_idx
+                continue
+            if block == base[base_idx]:
+                continue # deleted by us
+            conflicts.append({"key": block_key(block), "field": "deleted by us", "base": base[base_idx], "ours": MISSING, "theirs": block})
+        inserts.setdefault(anchor, []).append(block)
+
+    merged = list(inserts.get(-1, []))
+    for idx in range(len(ours)):
+        if result[idx] is not None:
+            merged.append(result[idx])
+        merged.extend(inserts.get(idx, []))
+    return merged, conflicts
+
+def format_value(value):
+    if value is MISSING:
+        return "<none>"
+    if isinstance(value, dict) and "env" in value:
+        return "<block>"
+    return repr(value)
+
+def format_conflicts(conflicts):
+    lines = []
+    for conflict in conflicts:
+        field = conflict["field"] or "block"
+        lines.append(f"{describe_key(conflict['key'])} {field}: kept ours {format_value(conflict['ours'])}, "
+                     f"theirs {format_value(conflict['theirs'])}, base {format_value(conflict['base'])}")
+    return lines
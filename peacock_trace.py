@@ -0,0 +1,95 @@
+"""Opt-in timing instrumentation for profiling slow sessions on users' machines.
+
+Enabled with the PEACOCK_TRACE environment variable (or `--trace` on the
+GUI): "1" turns on the in-window overlay, any other value is also taken as
+a path to append a JSONL trace to. When disabled, spans are a shared no-op
+and nothing is wrapped, so normal sessions pay nothing.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+TRACE_ENV = "PEACOCK_TRACE"
+# Event-loop lag samples below this aren't written to the trace file
+LAG_THRESHOLD_MS = 50
+
+NO_SPAN = contextlib.nullcontext()
+
+class Tracer:
+    def __init__(self, path=None, enabled=True):
+        self.enabled = enabled
+        self.path = path
+        self.lock = threading.Lock() # parse spans are recorded from the loader thread
+        self.stats = {} # name -> [count, total seconds, max seconds]
+        self.counters = {}
+        self.last = {} # name -> most recent seconds
+        self.file = open(path, "a") if enabled and path else None
+
+    def record(self, name, seconds, log=True, **fields):
+        if not self.enabled:
+            return
+        with self.lock:
+            stat = self.stats.setdefault(name, [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+            self.last[name] = seconds
+            if log and self.file is not None:
+                event = {"t": round(time.time(), 3), "event": name, "ms": round(seconds * 1000, 3)}
+                event.update(fields)
+                self.file.write(json.dumps(event) + "\n")
+                self.file.flush()
+
+    @contextlib.contextmanager
+    def timed(self, name, **fields):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def span(self, name, **fields):
+        """Context manager timing its body under `name`."""
+        return self.timed(name, **fields) if self.enabled else NO_SPAN
+
+    def wrap(self, name, func):
+        if not self.enabled:
+            return func
+        def traced(*args, **kwargs):
+            with self.timed(name):
+                return func(*args, **kwargs)
+        traced.__wrapped__ = func
+        return traced
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def lag(self, seconds):
+        # Heartbeat samples are frequent, only the slow ones go to the file
+        self.record("event_loop_lag", seconds, log=seconds * 1000 >= LAG_THRESHOLD_MS)
+
+    def summary(self):
+        """{name: {"count", "avg_ms", "max_ms", "last_ms"}} plus the counters, for the overlay."""
+        with self.lock:
+            result = {name: {"count": count, "avg_ms": total * 1000 / count, "max_ms": worst * 1000, "last_ms": self.last[name] * 1000}
+                      for name, (count, total, worst) in self.stats.items()}
+            result.update(self.counters)
+        return result
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+NULL_TRACER = Tracer(enabled=False)
+
+def tracer_from_env(path=None, environ=None):
+    """A tracer configured from PEACOCK_TRACE, or from an explicit --trace path."""
+    value = path or (environ if environ is not None else os.environ).get(TRACE_ENV, "")
+    if value in ("", "0"):
+        return NULL_TRACER
+    return Tracer(path=None if value == "1" else value)
@@ -0,0 +1,54 @@
+"""Workspace support: finding the configs in a directory and caching their parses.
+
+Parsed configs are cached by path and keyed by (mtime, size), so reopening
+an unchanged file costs one os.stat() and a changed one is simply a miss.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+CONFIG_EXTENSIONS = (".json", ".json5")
+# Files the app keeps beside configs that aren't configs themselves
+NON_CONFIG_FILES = {"picklists.json", "window_config.json"}
+CACHE_SIZE = 16
+
+def list_config_files(directory):
+    """Sorted paths of the config files directly inside directory."""
+    paths = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.lower().endswith(CONFIG_EXTENSIONS) and entry.name not in NON_CONFIG_FILES:
+            paths.append(entry.path)
+    return sorted(paths, key=lambda p: os.path.basename(p).lower())
+
+def stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+class ParseCache:
+    """LRU of parsed configs. Cached data is shared, treat it as read-only."""
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # path -> (stat key, data, content hash)
+        self.lock = threading.Lock() # filled from the loader and save threads
+
+    def get(self, path, key=None):
+        """(data, content hash) if path is cached with this stat key, else None."""
+        if key is None:
+            key = stat_key(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None or entry[0] != key:
+                return None
+            self.entries.move_to_end(path)
+            return entry[1], entry[2]
+
+    def put(self, path, key, data, digest):
+        with self.lock:
+            self.entries[path] = (key, data, digest)
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard(self, path):
+        with self.lock:
+            self.entries.pop(path, None)
@@ -0,0 +1,23 @@
+from peacock_analyze import analyze_config, format_report
+from peacock_config import PicklistManager, new_block
+
+def test_duplicates_and_shadowed_blocks():
+    config = [
+        new_block("111111111111", "us-east-1"),
+        {"env": [{"account": "111111111111", "region": "us-east-1"}, {"account": "222222222222", "region": "us-east-1"}], "style": {}},
+        new_block("222222222222", "us-east-1"),
+    ]
+    report = analyze_config(config)
+    assert report["duplicates"] == {("111111111111", "us-east-1"): [0, 1], ("222222222222", "us-east-1"): [1, 2]}
+    assert report["shadowed"] == [2]
+    assert len(format_report(report)) == 3
+
+def test_unknown_accounts_and_regions(tmp_path):
+    picklists = PicklistManager(str(tmp_path / "picklists.json"))
+    picklists.add_account("111111111111", "Prod")
+    picklists.add_region("us-east-1")
+    config = [new_block("111111111111", "us-east-1"), new_block("999999999999", "eu-west-1")]
+    report = analyze_config(config, picklists)
+    assert report["unknown_accounts"] == {"999999999999": [1]}
+    assert report["unknown_regions"] == {"eu-west-1": [1]}
+    assert report["duplicates"] == {} and report["shadowed"] == []
@@ -0,0 +1,205 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import peacock_config
+
+def test_headless_import():
+    # The model and CLI must stay usable on hosts without a display
+    for module in ("peacock_config", "configurator"):
+        code = f"import sys, {module}; assert 'tkinter' not in sys.modules and 'customtkinter' not in sys.modules"
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_relaxed_and_strict_load_match(tmp_path):
+    config = peacock_config.load_config_file(os.path.join("examples", "CoSD_SSO_Configuration.json"))
+    strict_path = tmp_path / "strict.json"
+    peacock_config.save_config_file(str(strict_path), config, strict=True)
+    assert peacock_config.load_config_file(str(strict_path)) == config
+
+def test_normalize_and_clean():
+    config = [
+        {"env": [{"account": "1", "region": "us-east-1"}, {"account": "", "region": ""}], "style": {}, "_collapsed": True},
+        {"env": {"account": "2", "region": "us-west-2"}, "style": {}},
+    ]
+    peacock_config.normalize_config(config, "list")
+    assert config[0]["env"] == [{"account": "1", "region": "us-east-1"}]
+    assert isinstance(config[1]["env"], list)
+    peacock_config.normalize_config(config)
+    assert config[0]["env"] == {"account": "1", "region": "us-east-1"}
+    assert "_collapsed" not in peacock_config.clean_config(config)[0]
+
+def test_save_keeps_file_permissions(tmp_path):
+    path = tmp_path / "shared.json"
+    path.write_text("[]")
+    os.chmod(path, 0o644)
+    peacock_config.save_config_file(str(path), [peacock_config.new_block("1", "us-east-1")])
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    assert len(peacock_config.load_config_file(str(path))) == 1
+
+def test_validate_reports_bad_colors():
+    config = [peacock_config.new_block("1", "us-east-1")]
+    assert peacock_config.validate_config(config) == []
+    config[0]["style"]["navigationBackgroundColor"] = "blue"
+    assert len(peacock_config.validate_config(config)) == 1
+
+def test_cli_add_block_in_place(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("[]")
+    assert peacock_config.main(["add-block", str(path), "--account", "123", "--region", "us-east-1", "--theme", "-i", "--strict"]) == 0
+    config = peacock_config.load_config_file(str(path))
+    assert config[0]["env"] == {"account": "123", "region": "us-east-1"}
+    assert peacock_config.validate_config(config) == []
+
+def test_cli_theme_rejects_bad_index(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('[{"env": {"account": "1", "region": "us-east-1"}, "style": {}}]')
+    for mode in ([], ["--palette"], ["--seeded"]):
+        for index in ("0", "2"):
+            with pytest.raises(SystemExit) as exc:
+                peacock_config.main(["theme", str(path), "--index", index, "-i"] + mode)
+            assert "out of range" in str(exc.value)
+    assert peacock_config.load_config_file(str(path))[0]["style"] == {}
+
+def test_palette_is_distinct_and_readable():
+    palette = peacock_config.generate_palette(100, offset=0.25)
+    primaries = [primary for primary, _ in palette]
+    assert len(set(primaries)) == 100
+    white = peacock_config.hex_to_rgb(peacock_config.NAV_TEXT_COLOR)
+    for primary, secondary in palette:
+        assert peacock_config.contrast_ratio(peacock_config.hex_to_rgb(primary), white) >= peacock_config.MIN_TEXT_CONTRAST
+        assert peacock_config.contrast_ratio(peacock_config.hex_to_rgb(secondary), white) >= peacock_config.MIN_TEXT_CONTRAST
+    # Neighbours in the sequence should never look alike
+    for a, b in zip(primaries, primaries[1:]):
+        assert peacock_config.delta_e(peacock_config.hex_to_rgb(a), peacock_config.hex_to_rgb(b)) > 10
+
+def test_palette_contrast_holds_after_rounding():
+    for text_color in (peacock_config.NAV_TEXT_COLOR, "#000000"):
+        text = peacock_config.hex_to_rgb(text_color)
+        palette = peacock_config.generate_palette(2000, text_color=text_color, offset=0.5)
+        palette += [peacock_config.seeded_colors(peacock_config.new_block(str(n), "us-east-1"), text_color) for n in range(500)]
+        for primary, secondary in palette:
+            assert primary != secondary
+            for color in (primary, secondary):
+                assert peacock_config.contrast_ratio(peacock_config.hex_to_rgb(color), text) >= peacock_config.MIN_TEXT_CONTRAST
+
+def test_seeded_themes_are_stable():
+    config = [peacock_config.new_block("123456789012", "us-east-1"), peacock_config.new_block("123456789012", "us-west-2")]
+    peacock_config.assign_seeded_themes(config)
+    again = peacock_config.assign_seeded_themes([peacock_config.new_block("123456789012", "us-east-1")])
+    assert again[0]["style"] == config[0]["style"]
+    assert config[0]["style"] != config[1]["style"]
+
+def test_account_typeahead(tmp_path):
+    manager = peacock_config.PicklistManager(str(tmp_path / "picklists.json"))
+    manager.add_accounts([("111111111111", "Prod"), ("222222222222", "NonProd"), ("333333333333", "Sandbox")])
+    assert manager.search_accounts("prod") == ["Prod (111111111111)", "NonProd (222222222222)"]
+    assert manager.search_accounts("3333") == ["Sandbox (333333333333)"]
+    assert len(manager.search_accounts("", limit=2)) == 2
+    manager.add_account("444444444444", "Prodigy")
+    assert "Prodigy (444444444444)" in manager.search_accounts("prod")
+
+def test_account_indexes(tmp_path):
+    path = str(tmp_path / "picklists.json")
+    manager = peacock_config.PicklistManager(path)
+    for account_id, name in (("2", "Beta"), ("1", "Alpha"), ("3", "Beta"), ("4", "Gamma")):
+        assert manager.add_account(account_id, name)
+    assert not manager.add_account("1", "Duplicate")
+    assert manager.account_names == ["Alpha", "Beta", "Beta", "Gamma"]
+    assert manager.get_account_name("3") == "Beta"
+    # Removing one of two equal names removes that exact account
+    assert manager.remove_account("3")
+    assert not manager.remove_account("3")
+    assert [acc["id"] for acc in manager.accounts] == ["1", "2", "4"]
+    assert manager.get_account_name("3") == ""
+    reloaded = peacock_config.PicklistManager(path)
+    assert reloaded.accounts == manager.accounts
+    assert reloaded.account_names == ["Alpha", "Beta", "Gamma"]
+    assert set(reloaded.accounts_by_id) == {"1", "2", "4"}
+
+def test_account_display_cache(tmp_path):
+    manager = peacock_config.PicklistManager(str(tmp_path / "picklists.json"))
+    manager.add_account("1", "Alpha")
+    displays = manager.get_account_display_list()
+    assert displays == ["Alpha (1)"]
+    assert manager.get_account_display_list() is displays
+    assert manager.get_account_id_from_display("Alpha (1)") == "1"
+    assert manager.get_account_display("9") == "9"
+    # Any change bumps the version and rebuilds the shared list
+    version = manager.version
+    manager.add_account("2", "Beta")
+    assert manager.version > version
+    assert manager.get_account_display("2") == "Beta (2)"
+    manager.remove_account("1")
+    assert manager.get_account_display_list() == ["Beta (2)"]
+    assert manager.get_account_display("1") == "1"
+    # Displays not in the picklist fall back to parsing out the ID
+    assert manager.get_account_id_from_display("Alpha (1)") == "1"
+
+def test_picklist_saves_are_debounced(tmp_path):
+    path = tmp_path / "picklists.json"
+    # Long enough that only flush() writes during the test
+    manager = peacock_config.PicklistManager(str(path), save_delay=60)
+    manager.add_region("us-east-1")
+    manager.add_account("1", "Alpha")
+    manager.add_account("2", "Beta")
+    assert not path.exists()
+    manager.flush()
+    data = json.loads(path.read_text()) # written as strict JSON
+    assert data == {"regions": ["us-east-1"], "accounts": [{"id": "1", "name": "Alpha"}, {"id": "2", "name": "Beta"}]}
+    # Nothing pending, so another flush leaves the file alone
+    path.write_text("{}")
+    manager.flush()
+    assert path.read_text() == "{}"
+
+def test_import_account_exports(tmp_path):
+    cli_json = tmp_path / "accounts.json"
+    cli_json.write_text('{"Accounts": [{"Id": "111111111111", "Name": "Prod"}, {"Id": "222222222222", "Name": "Dev"}]}')
+    console_csv = tmp_path / "console.csv"
+    console_csv.write_text("Account ID,Account name,Email\n333333333333,Sandbox,a@example.com\n111111111111,Prod,b@example.com\n")
+    plain_csv = tmp_path / "plain.txt"
+    plain_csv.write_text("\ufeffName,Id\nLog Archive,444444444444\n")
+    assert list(peacock_config.iter_account_records(str(cli_json))) == [("111111111111", "Prod"), ("222222222222", "Dev")]
+    assert list(peacock_config.iter_account_records(str(console_csv))) == [("333333333333", "Sandbox"), ("111111111111", "Prod")]
+    assert list(peacock_config.iter_account_records(str(plain_csv))) == [("444444444444", "Log Archive")]
+    (tmp_path / "other").mkdir()
+    picklists = tmp_path / "other" / "picklists.json"
+    picklists.write_text('{regions: ["us-east-1",], accounts: [{id: "555555555555", name: "Audit",},],}')
+    assert list(peacock_config.iter_account_records(str(picklists))) == [("555555555555", "Audit")]
+    bad_csv = tmp_path / "bad.csv"
+    bad_csv.write_text("Email\na@example.com\n")
+    with pytest.raises(ValueError):
+        list(peacock_config.iter_account_records(str(bad_csv)))
+
+    manager = peacock_config.PicklistManager(str(tmp_path / "picklists.json"))
+    assert manager.import_accounts(str(cli_json)) == (2, 0)
+    assert manager.import_accounts(str(console_csv)) == (1, 1)
+    assert manager.add_accounts([("", "No ID"), ("444444444444", "Log Archive")]) == 1
+    assert manager.account_names == ["Dev", "Log Archive", "Prod", "Sandbox"]
+    assert manager.get_account_display("333333333333") == "Sandbox (333333333333)"
+
+def first_match(config, account, region):
+    # Which style the extension would apply: the first block with a matching env
+    for block in config:
+        for env in peacock_config.get_envs(block):
+            if env.get("account") == account and env.get("region") == region:
+                return block["style"]
+    return None
+
+def test_compact_preserves_first_match():
+    styles = [{"navigationBackgroundColor": c, "accountMenuButtonBackgroundColor": c} for c in ("#111111", "#222222")]
+    config = [
+        {"env": {"account": "1", "region": "us-east-1"}, "style": styles[0]},
+        {"env": {"account": "2", "region": "us-east-1"}, "style": styles[1]},
+        {"env": [{"account": "1", "region": "us-east-1"}, {"account": "3", "region": "us-east-1"}], "style": styles[1]},
+        {"env": {"account": "2", "region": "us-east-1"}, "style": styles[0]},
+        {"env": {"account": "4", "region": "us-east-1"}, "style": styles[0], "_collapsed": True},
+    ]
+    compact = peacock_config.compact_config(config)
+    assert len(compact) == 2
+    for account in "12345":
+        assert first_match(compact, account, "us-east-1") == first_match(config, account, "us-east-1")
+    text = peacock_config.serialize_config(config, compact=True)
+    assert "_collapsed" not in text and "\n" not in text
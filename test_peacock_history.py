@@ -0,0 +1,40 @@
+from peacock_config import new_block, set_theme
+from peacock_history import CHUNK_SIZE, ConfigHistory, freeze_block
+
+def freeze_all(config, previous):
+    # Like the GUI's side table, the last frozen view per block
+    frozen = [freeze_block(block, previous.get(id(block))) for block in config]
+    previous.update((id(block), value) for block, value in zip(config, frozen))
+    return frozen
+
+def test_unchanged_blocks_and_chunks_are_shared():
+    config = [new_block(str(i), "us-east-1") for i in range(CHUNK_SIZE * 4)]
+    frozen = {}
+    history = ConfigHistory()
+    history.reset(freeze_all(config, frozen))
+    before = history.current
+
+    set_theme(config[0], "#111111", "#222222")
+    assert history.commit(freeze_all(config, frozen))
+    after = history.current
+    assert after[0] is not before[0]
+    assert all(a is b for a, b in zip(after[1:], before[1:]))
+    assert after[0][1] is before[0][1]
+
+    # Nothing changed, nothing recorded
+    assert not history.commit(freeze_all(config, frozen))
+
+def test_undo_redo_round_trip():
+    config = [new_block("1", "us-east-1")]
+    frozen = {}
+    history = ConfigHistory()
+    history.reset(freeze_all(config, frozen))
+    config.append(new_block("2", "us-west-2"))
+    history.commit(freeze_all(config, frozen))
+
+    blocks = history.undo()
+    assert [b["env"]["account"] for b in blocks] == ["1"]
+    assert history.undo() is None
+    blocks = history.redo()
+    assert [b["env"]["account"] for b in blocks] == ["1", "2"]
+    assert not history.can_redo()
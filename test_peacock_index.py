@@ -0,0 +1,29 @@
+from peacock_config import new_block
+from peacock_index import BlockIndex
+
+def make_config():
+    config = [new_block("111111111111", "us-east-1"), new_block("222222222222", "us-west-2"), new_block("111111111111", "eu-west-1")]
+    config[1]["style"]["navigationBackgroundColor"] = "#abcdef"
+    return config
+
+def test_prefix_terms_and_intersection():
+    config = make_config()
+    index = BlockIndex()
+    index.rebuild(config)
+    assert index.search("1111") == {id(config[0]), id(config[2])}
+    assert index.search("west") == {id(config[1]), id(config[2])}
+    assert index.search("1111 west") == {id(config[2])}
+    assert index.search("abcd") == {id(config[1])}
+    assert index.search("") == {id(block) for block in config}
+
+def test_incremental_update_and_remove():
+    config = make_config()
+    index = BlockIndex()
+    index.rebuild(config)
+    config[0]["env"]["region"] = "ap-south-1"
+    index.update(config[0])
+    assert index.search("ap-south") == {id(config[0])}
+    assert index.search("us-east") == set()
+    index.remove(config[0])
+    assert index.search("ap") == set()
+    assert "ap-south-1" not in index.postings
@@ -0,0 +1,59 @@
+import json
+
+import peacock_config
+from peacock_config import new_block, set_theme
+from peacock_merge import diff_configs, merge_configs
+
+def themed(account, region, nav="#111111", menu="#222222"):
+    block = new_block(account, region)
+    set_theme(block, nav, menu)
+    return block
+
+def test_diff_matches_blocks_by_env_not_position():
+    old = [themed("1", "us-east-1"), themed("2", "us-east-1"), themed("3", "eu-west-1")]
+    new = [themed("3", "eu-west-1"), themed("1", "us-east-1", nav="#999999"), themed("4", "us-east-1")]
+    changes = {(c["op"], c["key"]) for c in diff_configs(old, new)}
+    assert changes == {
+        ("changed", (("1", "us-east-1"),)),
+        ("removed", (("2", "us-east-1"),)),
+        ("added", (("4", "us-east-1"),)),
+    }
+
+def test_three_way_merge_combines_edits_and_reports_conflicts():
+    base = [themed("1", "us-east-1"), themed("2", "us-east-1"), themed("3", "eu-west-1")]
+    # Ours reorders, recolors block 1's nav and block 2's nav, and adds block 4
+    ours = [themed("2", "us-east-1", nav="#aaaaaa"), themed("1", "us-east-1", nav="#333333"), base[2], themed("4", "us-east-1")]
+    # Theirs recolors block 1's menu and block 2's nav, and deletes block 3
+    theirs = [themed("1", "us-east-1", menu="#444444"), themed("2", "us-east-1", nav="#bbbbbb")]
+
+    merged, conflicts = merge_configs(base, ours, theirs)
+    by_account = {block["env"]["account"]: block["style"] for block in merged}
+    assert [block["env"]["account"] for block in merged] == ["2", "1", "4"]
+    assert by_account["1"] == {"navigationBackgroundColor": "#333333", "accountMenuButtonBackgroundColor": "#444444"}
+    assert by_account["2"]["navigationBackgroundColor"] == "#aaaaaa" # ours wins the conflict
+    assert [(c["key"], c["field"]) for c in conflicts] == [((("2", "us-east-1"),), "style.navigationBackgroundColor")]
+    # Untouched blocks come back as the same objects
+    assert merged[2] is ours[3]
+
+def test_blocks_added_on_both_sides_with_the_same_key():
+    ours = [themed("1", "us-east-1"), themed("1", "us-east-1", nav="#333333")]
+    merged, conflicts = merge_configs([], ours, ours)
+    assert merged == ours and conflicts == []
+
+    # The second theirs block is a separate block, not folded into the first
+    theirs = [themed("1", "us-east-1"), themed("1", "us-east-1", nav="#333333"), themed("1", "us-east-1", nav="#444444")]
+    merged, conflicts = merge_configs([], ours[:1], theirs)
+    assert [block["style"]["navigationBackgroundColor"] for block in merged] == ["#111111", "#333333", "#444444"]
+    assert conflicts == []
+
+def test_cli_merge3(tmp_path):
+    base = [themed("1", "us-east-1")]
+    paths = {}
+    for name, config in [("base", base), ("ours", base + [themed("2", "us-east-1")]), ("theirs", [themed("1", "us-east-1", nav="#555555")])]:
+        paths[name] = tmp_path / f"{name}.json"
+        paths[name].write_text(json.dumps(config))
+    out = tmp_path / "out.json"
+    assert peacock_config.main(["merge3", str(paths["base"]), str(paths["ours"]), str(paths["theirs"]), "--strict", "-o", str(out)]) == 0
+    merged = json.loads(out.read_text())
+    assert [block["env"]["account"] for block in merged] == ["1", "2"]
+    assert merged[0]["style"]["navigationBackgroundColor"] == "#555555"
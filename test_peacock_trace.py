@@ -0,0 +1,31 @@
+import json
+
+from peacock_trace import NULL_TRACER, tracer_from_env
+
+def test_disabled_unless_env_set():
+    assert tracer_from_env(environ={}) is NULL_TRACER
+    assert tracer_from_env(environ={"PEACOCK_TRACE": "0"}) is NULL_TRACER
+    func = lambda: 1
+    assert NULL_TRACER.wrap("f", func) is func
+    with NULL_TRACER.span("f"):
+        pass
+    assert NULL_TRACER.summary() == {}
+
+def test_spans_and_lag_go_to_jsonl(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = tracer_from_env(environ={"PEACOCK_TRACE": str(path)})
+    with tracer.span("parse", bytes=10):
+        pass
+    assert tracer.wrap("create_config_card", lambda x: x * 2)(2) == 4
+    tracer.lag(0.001) # under the threshold, summarized but not written
+    tracer.lag(0.2)
+    tracer.count("widgets_created", 3)
+    tracer.close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e["event"] for e in events] == ["parse", "create_config_card", "event_loop_lag"]
+    assert events[0]["bytes"] == 10
+    summary = tracer.summary()
+    assert summary["event_loop_lag"]["count"] == 2
+    assert summary["event_loop_lag"]["max_ms"] == 200
+    assert summary["widgets_created"] == 3
@@ -0,0 +1,25 @@
+import os
+
+from peacock_workspace import ParseCache, list_config_files, stat_key
+
+def test_list_config_files_skips_app_files(tmp_path):
+    for name in ["b.json", "A.json5", "picklists.json", "window_config.json", "notes.txt"]:
+        (tmp_path / name).write_text("[]")
+    (tmp_path / "sub.json").mkdir()
+    assert [os.path.basename(p) for p in list_config_files(tmp_path)] == ["A.json5", "b.json"]
+
+def test_parse_cache_keys_on_stat_and_evicts_lru(tmp_path):
+    paths = [str(tmp_path / f"{n}.json") for n in range(3)]
+    cache = ParseCache(max_entries=2)
+    for n, path in enumerate(paths):
+        with open(path, "w") as f:
+            f.write("[]")
+        cache.put(path, stat_key(path), [n], f"hash{n}")
+    assert cache.get(paths[0]) is None # evicted
+    assert cache.get(paths[1]) == ([1], "hash1")
+
+    # A rewrite changes the stat key, so the old parse is not returned
+    with open(paths[2], "w") as f:
+        f.write("[{}]")
+    os.utime(paths[2], ns=(1, 1))
+    assert cache.get(paths[2]) is None